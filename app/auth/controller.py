@@ -1,13 +1,21 @@
+from collections import OrderedDict
 from datetime import timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+import hashlib
 import logging
+import os
+import threading
+import time
 
 from app.auth.service import AuthService
 from app.auth.model import UserRegisterRequest, UserLogin, Token, TokenData
-from backend.controllers.users.UsersController import UsersController
+from backend.core.metrics import cache_hit, cache_miss
+from backend.core.timing import span
+from backend.controllers.users.UsersController import UsersController, AsyncUsersController
 from backend.models.users.UsersModel import UserCreate, User, RolEnum
 
 logger = logging.getLogger(__name__)
@@ -19,25 +27,29 @@ class AuthController:
         self.auth_service = AuthService()
         self.users_controller = UsersController(session)
 
-    def register_user(self, user_data: UserRegisterRequest) -> Token:
-        """Register a new user using existing UsersController"""
-        # Validate role
+    def _validate_role(self, user_data: UserRegisterRequest) -> None:
         if user_data.rol not in ["user", "admin"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Rol inválido. Debe ser 'user' o 'admin'"
             )
 
-        # Hash password and create user using existing UserCreate model
-        hashed_password = self.auth_service.get_password_hash(user_data.contrasena)
-        
-        user_create_data = UserCreate(
+    def _build_user_create(self, user_data: UserRegisterRequest, hashed_password: str) -> UserCreate:
+        return UserCreate(
             nombre=user_data.nombre,
             email=user_data.email,
             contrasena_hash=hashed_password,
             rol=RolEnum(user_data.rol)
         )
 
+    def register_user(self, user_data: UserRegisterRequest) -> Token:
+        """Register a new user using existing UsersController"""
+        self._validate_role(user_data)
+
+        # Hash password and create user using existing UserCreate model
+        hashed_password = self.auth_service.get_password_hash(user_data.contrasena)
+        user_create_data = self._build_user_create(user_data, hashed_password)
+
         # Use existing UsersController.create_user method
         created_user = self.users_controller.create_user(user_create_data)
 
@@ -93,49 +105,135 @@ class AuthController:
             role=token_data["role"]
         )
 
+class AsyncAuthController(AuthController):
+    """
+    AuthController for async routes: queries are awaited on the event loop and
+    bcrypt, which is CPU bound, runs in the password hashing process pool.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.auth_service = AuthService()
+        self.users_controller = AsyncUsersController(session)
+
+    async def register_user(self, user_data: UserRegisterRequest) -> Token:
+        self._validate_role(user_data)
+
+        hashed_password = await self.auth_service.get_password_hash_async(user_data.contrasena)
+        user_create_data = self._build_user_create(user_data, hashed_password)
+
+        created_user = await self.users_controller.create_user(user_create_data)
+        return self._generate_token_for_user(created_user)
+
+    async def login_user(self, login_data: UserLogin) -> Token:
+        user = await self.users_controller.get_user_by_email(login_data.email)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Email o contraseña incorrectos"
+            )
+
+        if not await self.auth_service.verify_password_async(login_data.contrasena, user.contrasena_hash):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Email o contraseña incorrectos"
+            )
+
+        return self._generate_token_for_user(user)
+
+class TokenCache:
+    """
+    Bounded LRU of already verified tokens, keyed by their SHA-256 digest.
+    An entry is only served until the token's own `exp`, so a cached token
+    stops authenticating at exactly the same moment the JWT would.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[TokenData, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[TokenData]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                cache_miss("auth_token")
+                return None
+            token_data, exp = entry
+            if exp <= time.time():
+                del self._entries[key]
+                cache_miss("auth_token")
+                return None
+            self._entries.move_to_end(key)
+            cache_hit("auth_token")
+            return token_data
+
+    def put(self, token: str, token_data: TokenData, exp: Optional[float]) -> None:
+        # Tokens without exp never expire by themselves; don't pin them in memory
+        if self.maxsize <= 0 or exp is None:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (token_data, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 # Create a single instance of AuthService for dependencies
 _auth_service = AuthService()
+_token_cache = TokenCache(int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096")))
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> TokenData:
     """Dependency to get current user - FIXED VERSION"""
-    try:
-        token = credentials.credentials
-        logger.info(f"Received token in dependency: {token[:20]}...")
+    with span("auth"):
+        try:
+            token = credentials.credentials
+            cached = _token_cache.get(token)
+            if cached is not None:
+                return cached
         
-        token_data = _auth_service.verify_token(token)
+            token_data = _auth_service.verify_token(token)
         
-        result = TokenData(
-            email=token_data["email"],
-            user_id=token_data["user_id"],
-            role=token_data["role"]
-        )
+            result = TokenData(
+                email=token_data["email"],
+                user_id=token_data["user_id"],
+                role=token_data["role"]
+            )
+            _token_cache.put(token, result, token_data["exp"])
         
-        logger.info(f"Successfully authenticated user: {result.email} (ID: {result.user_id})")
-        return result
+            logger.debug("Authenticated user %s (ID: %s)", result.email, result.user_id)
+            return result
         
-    except HTTPException as e:
-        logger.error(f"Authentication failed: {e.detail}")
-        raise e
-    except Exception as e:
-        logger.error(f"Unexpected error in get_current_user: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Error de autenticación: {str(e)}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        except HTTPException as e:
+            logger.debug("Authentication failed: %s", e.detail)
+            raise e
+        except Exception as e:
+            logger.error("Unexpected error in get_current_user: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Error de autenticación: {str(e)}",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
 def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     """Dependency to require admin role"""
-    logger.info(f"Checking admin privileges for user: {current_user.email} (role: {current_user.role})")
-    
     if current_user.role != "admin":
-        logger.warning(f"Access denied for user {current_user.email} - not admin")
+        logger.warning("Access denied for user %s - not admin", current_user.email)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acceso denegado. Se requieren permisos de administrador"
         )
     
-    logger.info(f"Admin access granted for user: {current_user.email}")
+    logger.debug("Admin access granted for user %s", current_user.email)
     return current_user
\ No newline at end of file
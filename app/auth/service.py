@@ -1,6 +1,11 @@
+import asyncio
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -8,9 +13,102 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# bcrypt cost factor for new hashes; existing hashes keep verifying with their own
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+_pwd_contexts: Dict[int, CryptContext] = {}
+
+def _pwd_context(rounds: int) -> CryptContext:
+    context = _pwd_contexts.get(rounds)
+    if context is None:
+        context = _pwd_contexts[rounds] = CryptContext(
+            schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds
+        )
+    return context
+
+# Module level so they can be pickled into the hashing processes
+def _hash_password(password: str, rounds: int) -> str:
+    return _pwd_context(rounds).hash(password)
+
+def _verify_password(plain_password: str, hashed_password: str, rounds: int) -> bool:
+    return _pwd_context(rounds).verify(plain_password, hashed_password)
+
+class PasswordHashPool:
+    """
+    Dedicated process pool for bcrypt, so hashing uses every core without
+    taking threads from the request threadpool. At most `max_pending` jobs may
+    be queued or running; beyond that callers get an immediate 503.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs the event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                logger.warning("Password hashing queue full (%d pending)", self._pending)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Servidor ocupado, intenta de nuevo en unos segundos",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+            executor = self._get_executor()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._pending -= 1
+                self._discard(executor)
+                raise
+        future.add_done_callback(self._done)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # A worker died; the next call starts a fresh pool
+        if self._executor is executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+_default_workers = int(os.getenv("BCRYPT_WORKERS", str(os.cpu_count() or 1)))
+password_pool = PasswordHashPool(
+    workers=_default_workers,
+    max_pending=int(os.getenv("BCRYPT_MAX_PENDING", str(_default_workers * 8))),
+)
+
 class AuthService:
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.bcrypt_rounds = BCRYPT_ROUNDS
+        self.pwd_context = _pwd_context(self.bcrypt_rounds)
         self.secret_key = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
         self.algorithm = "HS256"
         self.access_token_expire_minutes = int(os.getenv("JWT_EXPIRE_MINUTES", "30"))
@@ -23,6 +121,14 @@ class AuthService:
         """Generate password hash"""
         return self.pwd_context.hash(password)
 
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """verify_password in the bcrypt process pool"""
+        return await password_pool.run(_verify_password, plain_password, hashed_password, self.bcrypt_rounds)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """get_password_hash in the bcrypt process pool"""
+        return await password_pool.run(_hash_password, password, self.bcrypt_rounds)
+
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Create JWT access token"""
         to_encode = data.copy()
@@ -34,23 +140,21 @@ class AuthService:
         
         to_encode.update({"exp": expire})
         
-        logger.info(f"Creating token with payload: {to_encode}")
+        logger.debug("Creating token for user %s", to_encode.get("sub"))
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
     def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify and decode JWT token"""
         try:
-            logger.info(f"Verifying token: {token[:20]}...")
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            logger.info(f"Token payload: {payload}")
             
             email: str = payload.get("sub")
             user_id: int = payload.get("user_id")
             role: str = payload.get("role")
             
             if email is None or user_id is None:
-                logger.error(f"Missing required fields in token. Email: {email}, User ID: {user_id}")
+                logger.warning("Missing required fields in token. Email: %s, User ID: %s", email, user_id)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Token inválido - campos requeridos faltantes",
@@ -60,20 +164,21 @@ class AuthService:
             result = {
                 "email": email,
                 "user_id": user_id,
-                "role": role
+                "role": role,
+                "exp": payload.get("exp")
             }
-            logger.info(f"Token verification successful: {result}")
+            logger.debug("Token verification successful for user %s", email)
             return result
             
         except JWTError as e:
-            logger.error(f"JWT Error: {str(e)}")
+            logger.warning("JWT error: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Token inválido - {str(e)}",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         except Exception as e:
-            logger.error(f"Unexpected error in token verification: {str(e)}")
+            logger.error("Unexpected error in token verification: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Error de autenticación - {str(e)}",
@@ -6,12 +6,13 @@ INSERT INTO user (nombre, contrasena_hash, rol, email) VALUES
 ('Carlos López', 'hash345678', 'user', 'carlos.lopez@geresaco.com'),
 ('Ana Martínez', 'hash901234', 'admin', 'ana.martinez@geresaco.com');
 
-INSERT INTO room (nombre, sede, capacidad, recursos) VALUES
-('Sala de Juntas 1', 'zona_franca', 10, 'Proyector, Pizarra, WiFi'),
-('Sala de Capacitación', 'cajasan', 20, 'Proyector, Computadores, WiFi'),
-('Sala Ejecutiva', 'bogota', 8, 'Proyector, TV, WiFi'),
-('Sala de Reuniones', 'cucuta', 12, 'Pizarra, WiFi'),
-('Sala Principal', 'guatemala', 15, 'Proyector, Pizarra, WiFi');
+-- recursos_mask: pizarra = 1, proyector = 2, televisor = 4
+INSERT INTO room (nombre, sede, capacidad, recursos_mask) VALUES
+('Sala de Juntas 1', 'zona_franca', 10, 3),
+('Sala de Capacitación', 'cajasan', 20, 2),
+('Sala Ejecutiva', 'bogota', 8, 6),
+('Sala de Reuniones', 'cucuta', 12, 1),
+('Sala Principal', 'guatemala', 15, 3);
 
 INSERT INTO reservation (fecha, hora_inicio, hora_fin, estado, usuario_id, sala_id) VALUES
 ('2025-08-15', '09:00:00', '11:00:00', 'confirmada', 1, 1),
@@ -18,9 +18,29 @@ CREATE TABLE room (
   nombre varchar(255) NOT NULL,
   sede enum('zona_franca','cajasan','bogota','cucuta','guatemala') NOT NULL,
   capacidad int NOT NULL,
-  recursos varchar(255) NOT NULL,
   id int NOT NULL AUTO_INCREMENT,
-  PRIMARY KEY (id)
+  recursos_mask int NOT NULL DEFAULT '0',
+  PRIMARY KEY (id),
+  KEY ix_room_recursos_mask (recursos_mask)
+) ENGINE=InnoDB;
+
+CREATE TABLE reservation_series (
+  fecha_inicio date NOT NULL,
+  fecha_fin date NOT NULL,
+  hora_inicio time NOT NULL,
+  hora_fin time NOT NULL,
+  frecuencia enum('diaria','semanal') NOT NULL,
+  intervalo int NOT NULL,
+  dias_semana varchar(255) DEFAULT NULL,
+  id int NOT NULL AUTO_INCREMENT,
+  usuario_id int NOT NULL,
+  sala_id int NOT NULL,
+  estado enum('activa','cancelada') NOT NULL,
+  PRIMARY KEY (id),
+  KEY ix_reservation_series_usuario_id (usuario_id),
+  KEY ix_reservation_series_sala_id (sala_id),
+  CONSTRAINT reservation_series_ibfk_1 FOREIGN KEY (usuario_id) REFERENCES user (id),
+  CONSTRAINT reservation_series_ibfk_2 FOREIGN KEY (sala_id) REFERENCES room (id)
 ) ENGINE=InnoDB;
 
 CREATE TABLE reservation (
@@ -31,9 +51,27 @@ CREATE TABLE reservation (
   id int NOT NULL AUTO_INCREMENT,
   usuario_id int NOT NULL,
   sala_id int NOT NULL,
+  serie_id int DEFAULT NULL,
   PRIMARY KEY (id),
   KEY ix_reservation_sala_id (sala_id),
+  KEY ix_reservation_serie_id (serie_id),
   KEY ix_reservation_usuario_id (usuario_id),
+  KEY ix_reservation_sala_fecha_hora (sala_id, fecha, hora_inicio),
+  KEY ix_reservation_usuario_fecha_hora (usuario_id, fecha, hora_inicio),
+  KEY ix_reservation_fecha_hora (fecha, hora_inicio),
   CONSTRAINT reservation_ibfk_1 FOREIGN KEY (usuario_id) REFERENCES user (id),
-  CONSTRAINT reservation_ibfk_2 FOREIGN KEY (sala_id) REFERENCES room (id)
+  CONSTRAINT reservation_ibfk_2 FOREIGN KEY (sala_id) REFERENCES room (id),
+  CONSTRAINT reservation_ibfk_3 FOREIGN KEY (serie_id) REFERENCES reservation_series (id)
+) ENGINE=InnoDB;
+
+CREATE TABLE room_day_summary (
+  sala_id int NOT NULL,
+  fecha date NOT NULL,
+  mask tinyblob NOT NULL,
+  pendientes int NOT NULL,
+  confirmadas int NOT NULL,
+  canceladas int NOT NULL,
+  PRIMARY KEY (sala_id, fecha),
+  KEY ix_room_day_summary_fecha (fecha),
+  CONSTRAINT room_day_summary_ibfk_1 FOREIGN KEY (sala_id) REFERENCES room (id)
 ) ENGINE=InnoDB;
\ No newline at end of file
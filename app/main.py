@@ -1,17 +1,16 @@
+import time
+
+# Measured from here: the cost of importing the application, then of bootstrapping it
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 import os
 import sys
 import logging
 import threading
-import time
 from contextlib import asynccontextmanager
 
-# Configure logging FIRST
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Cargar variables de entorno
@@ -23,15 +22,39 @@ PROJECT_ROOT = os.path.abspath(os.path.join(BASE_DIR, ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+# Configure logging before anything else logs
+from backend.core.logs import configure_logging
+configure_logging()
+
 from backend.core.db import create_db_and_tables
+from backend.core.compression import CompressionMiddleware
+from backend.core.querystats import QueryStatsMiddleware
+from backend.core.metrics import MetricsMiddleware
+from backend.core.timing import ServerTimingMiddleware
+from app.auth.service import password_pool
 from backend.routes.users.UsersRoutes import router as users_router
 from backend.routes.rooms.RoomsRoutes import router as rooms_router
 from backend.routes.reservations.ReservationsRoutes import router as reservations_router
 from backend.routes.auth.AuthRoutes import router as auth_router
+from backend.routes.series.SeriesRoutes import router as series_router
+from backend.routes.admin.AdminRoutes import router as admin_router
+from backend.routes.analytics.AnalyticsRoutes import router as analytics_router
+from backend.routes.metrics.MetricsRoutes import router as metrics_router
 
 from backend.models.users.UsersModel import User
 from backend.models.rooms.RoomsModel import Room
 from backend.models.reservations.ReservationsModel import Reservation
+from backend.models.series.SeriesModel import ReservationSeries
+
+IMPORTS_FINISHED = time.perf_counter()
+
+def console_interface_enabled() -> bool:
+    """
+    The console is a development tool: off when the app is served by uvicorn or
+    gunicorn workers, on when started with `python app/main.py` (which sets
+    ENABLE_CONSOLE_INTERFACE=true unless it is already set).
+    """
+    return os.getenv("ENABLE_CONSOLE_INTERFACE", "false").lower() == "true"
 
 def start_console_interface_thread():
     """Start console interface in a separate thread after a delay"""
@@ -39,16 +62,15 @@ def start_console_interface_thread():
         # Wait for the server to start
         time.sleep(3)
         
-        # Check if we're running in development mode
-        if os.getenv("ENABLE_CONSOLE_INTERFACE", "true").lower() == "true":
-            try:
-                from app.utils.console_interface import start_console_interface
-                logger.info("🖥️  Iniciando interfaz de consola...")
-                start_console_interface()
-            except ImportError as e:
-                logger.error(f"Error importing console interface: {e}")
-            except Exception as e:
-                logger.error(f"Error starting console interface: {e}")
+        try:
+            # Imported here: it pulls in `requests`, which the server itself never needs
+            from app.utils.console_interface import start_console_interface
+            logger.info("🖥️  Iniciando interfaz de consola...")
+            start_console_interface()
+        except ImportError as e:
+            logger.error(f"Error importing console interface: {e}")
+        except Exception as e:
+            logger.error(f"Error starting console interface: {e}")
     
     # Start console interface in a separate thread
     console_thread = threading.Thread(target=delayed_start, daemon=True)
@@ -57,13 +79,21 @@ def start_console_interface_thread():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 Application startup complete. Creating database and tables...")
+    bootstrap_started = time.perf_counter()
     create_db_and_tables()
+    finished = time.perf_counter()
+    logger.info(
+        f"⏱️  Arranque en {(finished - IMPORT_STARTED) * 1000:.0f} ms "
+        f"(importaciones {(IMPORTS_FINISHED - IMPORT_STARTED) * 1000:.0f} ms, "
+        f"base de datos {(finished - bootstrap_started) * 1000:.0f} ms)"
+    )
     
     # Start console interface if enabled
-    if os.getenv("ENABLE_CONSOLE_INTERFACE", "true").lower() == "true":
+    if console_interface_enabled():
         start_console_interface_thread()
     
     yield
+    password_pool.shutdown()
     logger.info("🛑 Application shutdown.")
 
 app = FastAPI(
@@ -72,11 +102,27 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Comprimir respuestas grandes (brotli/gzip según Accept-Encoding)
+app.add_middleware(CompressionMiddleware)
+
+# Cabecera Server-Timing (auth, handler, render, db) y registro de peticiones lentas
+app.add_middleware(ServerTimingMiddleware)
+
+# Consultas y tiempo de base de datos por petición (cabeceras X-DB-* con DEBUG=true)
+app.add_middleware(QueryStatsMiddleware)
+
+# Métricas de Prometheus por ruta y método (expuestas en /metrics)
+app.add_middleware(MetricsMiddleware)
+
 # Incluir rutas
 app.include_router(users_router)
 app.include_router(rooms_router)
 app.include_router(reservations_router)
+app.include_router(series_router)
 app.include_router(auth_router)
+app.include_router(analytics_router)
+app.include_router(admin_router)
+app.include_router(metrics_router)
 
 @app.get("/")
 def health_check():
@@ -92,4 +138,7 @@ if __name__ == "__main__":
     print("🖥️  Interfaz de consola se iniciará automáticamente...")
     print("-" * 50)
     
+    # Development entry point: the console is on unless explicitly disabled
+    os.environ.setdefault("ENABLE_CONSOLE_INTERFACE", "true")
+    
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
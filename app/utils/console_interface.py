@@ -400,17 +400,53 @@ class ConsoleInterface:
         print("\n--- HACER UNA RESERVA ---")
         print()
 
-        # First, get and show available rooms
-        print("📋 Consultando salas disponibles...")
+        # First, get reservation date
+        while True:
+            fecha_str = self.get_user_input("Ingrese la fecha de reserva (YYYY-MM-DD): ")
+            if self.validate_date(fecha_str):
+                # Check if date is not in the past
+                reservation_date = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+                if reservation_date >= date.today():
+                    break
+                else:
+                    print("❌ La fecha no puede ser anterior a hoy.")
+            else:
+                print("❌ Formato de fecha inválido. Use YYYY-MM-DD (ej: 2024-12-25)")
+
+        # Get start time
+        while True:
+            hora_inicio_str = self.get_user_input("Ingrese la hora de inicio (HH:MM, formato 24h): ")
+            if self.validate_time(hora_inicio_str):
+                break
+            else:
+                print("❌ Formato de hora inválido. Use HH:MM (ej: 14:30)")
+
+        # Calculate end time (1 hour later as per business rules)
         try:
-            response = self.make_authenticated_request("GET", "/rooms/")
+            start_time = datetime.strptime(hora_inicio_str, '%H:%M').time()
+            start_datetime = datetime.combine(date.today(), start_time)
+            end_datetime = start_datetime.replace(hour=start_datetime.hour + 1)
+            hora_fin_str = end_datetime.strftime('%H:%M')
+            
+            print(f"⏰ Duración de la reserva: 1 hora ({hora_inicio_str} - {hora_fin_str})")
+            
+        except Exception as e:
+            print(f"❌ Error calculando hora de fin: {str(e)}")
+            return
+
+        # Then, get and show the rooms that are free for that slot
+        print("\n📋 Consultando salas disponibles...")
+        try:
+            response = self.make_authenticated_request(
+                "GET", f"/rooms/available?fecha={fecha_str}&hora_inicio={hora_inicio_str}"
+            )
             if response.status_code != 200:
                 print(f"❌ Error obteniendo salas: {response.text}")
                 return
             
             rooms = response.json()
             if not rooms:
-                print("❌ No hay salas disponibles.")
+                print("❌ No hay salas disponibles en ese horario.")
                 return
 
             print(f"\n🏢 Salas disponibles ({len(rooms)}):")
@@ -440,40 +476,6 @@ class ConsoleInterface:
 
         print(f"\n✅ Sala seleccionada: {selected_room['nombre']}")
 
-        # Get reservation date
-        while True:
-            fecha_str = self.get_user_input("Ingrese la fecha de reserva (YYYY-MM-DD): ")
-            if self.validate_date(fecha_str):
-                # Check if date is not in the past
-                reservation_date = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-                if reservation_date >= date.today():
-                    break
-                else:
-                    print("❌ La fecha no puede ser anterior a hoy.")
-            else:
-                print("❌ Formato de fecha inválido. Use YYYY-MM-DD (ej: 2024-12-25)")
-
-        # Get start time
-        while True:
-            hora_inicio_str = self.get_user_input("Ingrese la hora de inicio (HH:MM, formato 24h): ")
-            if self.validate_time(hora_inicio_str):
-                break
-            else:
-                print("❌ Formato de hora inválido. Use HH:MM (ej: 14:30)")
-
-        # Calculate end time (1 hour later as per business rules)
-        try:
-            start_time = datetime.strptime(hora_inicio_str, '%H:%M').time()
-            start_datetime = datetime.combine(date.today(), start_time)
-            end_datetime = start_datetime.replace(hour=start_datetime.hour + 1)
-            hora_fin_str = end_datetime.strftime('%H:%M')
-            
-            print(f"⏰ Duración de la reserva: 1 hora ({hora_inicio_str} - {hora_fin_str})")
-            
-        except Exception as e:
-            print(f"❌ Error calculando hora de fin: {str(e)}")
-            return
-
         # Create reservation with "pendiente" status first
         print(f"\n📋 RESUMEN DE LA RESERVA:")
         print(f"🏢 Sala: {selected_room['nombre']}")
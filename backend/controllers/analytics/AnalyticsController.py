@@ -0,0 +1,146 @@
+import os
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlmodel import Session, select
+
+from backend.core.cache import TTLCache
+from backend.core.db import AsyncController
+from backend.core.etag import table_versions
+from backend.models.analytics.AnalyticsModel import *
+from backend.models.rooms.RoomsModel import Room, SedeEnum
+from backend.models.series.SeriesModel import DIAS_SEMANA
+from backend.models.summary.SummaryModel import RoomDaySummary
+
+MAX_RANGE_DAYS = 366
+
+# Opening hours that define how many hours a room can be booked per day
+HORA_APERTURA = int(os.getenv("ANALYTICS_HORA_APERTURA", "8"))
+HORA_CIERRE = int(os.getenv("ANALYTICS_HORA_CIERRE", "18"))
+
+_report_cache = TTLCache(ttl=float(os.getenv("ANALYTICS_CACHE_TTL", "300")), name="analytics_report")
+
+HOUR_MASK = (1 << 60) - 1
+
+def _minutes_by_hour(mask: int) -> Dict[int, int]:
+    """Booked minutes of each hour of a day mask, skipping the empty hours"""
+    hours = {}
+    while mask:
+        hora = ((mask & -mask).bit_length() - 1) // 60
+        hours[hora] = ((mask >> (hora * 60)) & HOUR_MASK).bit_count()
+        mask &= ~(HOUR_MASK << (hora * 60))
+    return hours
+
+def _utilization(booked_minutes: float, bookable_hours: float) -> dict:
+    booked_hours = booked_minutes / 60
+    return {
+        "horas_reservadas": round(booked_hours, 2),
+        "horas_disponibles": round(bookable_hours, 2),
+        "ocupacion": round(booked_hours / bookable_hours, 4) if bookable_hours else 0.0,
+    }
+
+class AnalyticsController:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _booked_masks(self, desde: date, hasta: date, sede: Optional[SedeEnum]):
+        """Booked-minute mask of every room-day in the range, one row each from room_day_summary"""
+        query = (
+            select(RoomDaySummary.sala_id, RoomDaySummary.fecha, RoomDaySummary.mask)
+            .where(RoomDaySummary.fecha >= desde)
+            .where(RoomDaySummary.fecha <= hasta)
+        )
+        if sede:
+            query = query.join(Room, Room.id == RoomDaySummary.sala_id).where(Room.sede == sede)
+        return self.session.exec(query).all()
+
+    def get_utilization(self, desde: date, hasta: date, sede: Optional[SedeEnum] = None) -> UtilizationReport:
+        """Occupancy rates by sede, room, weekday and hour over [desde, hasta]"""
+        if hasta < desde:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha 'hasta' no puede ser anterior a 'desde'",
+            )
+        if (hasta - desde).days + 1 > MAX_RANGE_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El rango no puede superar {MAX_RANGE_DAYS} días",
+            )
+
+        # The table versions change with every committed write, so a report
+        # cached before a reservation or room changed is never served again
+        key = (
+            desde, hasta, sede,
+            table_versions.get(RoomDaySummary.__tablename__), table_versions.get(Room.__tablename__),
+        )
+        cached = _report_cache.get(key)
+        if cached is not None:
+            return cached
+
+        rooms_query = select(Room.id, Room.nombre, Room.sede).order_by(Room.id)
+        if sede:
+            rooms_query = rooms_query.where(Room.sede == sede)
+        rooms = self.session.exec(rooms_query).all()
+
+        by_room: Dict[int, int] = defaultdict(int)
+        by_weekday: Dict[int, int] = defaultdict(int)
+        by_hour: Dict[int, int] = defaultdict(int)
+        for sala_id, fecha, mask in self._booked_masks(desde, hasta, sede):
+            booked = int.from_bytes(mask, "little")
+            minutes = booked.bit_count()
+            by_room[sala_id] += minutes
+            by_weekday[fecha.weekday()] += minutes
+            for hora, hour_minutes in _minutes_by_hour(booked).items():
+                by_hour[hora] += hour_minutes
+
+        days = (hasta - desde).days + 1
+        weekday_days = [0] * 7
+        for offset in range(days):
+            weekday_days[(desde + timedelta(days=offset)).weekday()] += 1
+        hours_per_day = max(HORA_CIERRE - HORA_APERTURA, 0)
+        room_hours = days * hours_per_day
+
+        sedes: Dict[SedeEnum, List[int]] = defaultdict(list)
+        for sala_id, _, room_sede in rooms:
+            sedes[room_sede].append(sala_id)
+
+        hours = sorted(set(range(HORA_APERTURA, HORA_CIERRE)) | set(by_hour))
+        report = UtilizationReport(
+            desde=desde,
+            hasta=hasta,
+            sede=sede,
+            hora_apertura=HORA_APERTURA,
+            hora_cierre=HORA_CIERRE,
+            total=Utilization(**_utilization(sum(by_room.values()), len(rooms) * room_hours)),
+            por_sede=[
+                SedeUtilization(
+                    sede=room_sede,
+                    salas=len(ids),
+                    **_utilization(sum(by_room[i] for i in ids), len(ids) * room_hours),
+                )
+                for room_sede, ids in sedes.items()
+            ],
+            por_sala=[
+                RoomUtilization(sala_id=sala_id, nombre=nombre, sede=room_sede, **_utilization(by_room[sala_id], room_hours))
+                for sala_id, nombre, room_sede in rooms
+            ],
+            por_dia_semana=[
+                WeekdayUtilization(
+                    dia_semana=dia,
+                    nombre=DIAS_SEMANA[dia],
+                    **_utilization(by_weekday[dia], len(rooms) * weekday_days[dia] * hours_per_day),
+                )
+                for dia in range(7)
+            ],
+            por_hora=[
+                HourUtilization(hora=hora, **_utilization(by_hour[hora], len(rooms) * days))
+                for hora in hours
+            ],
+        )
+        _report_cache.put(key, report)
+        return report
+
+class AsyncAnalyticsController(AsyncController):
+    controller_class = AnalyticsController
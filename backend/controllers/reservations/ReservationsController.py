@@ -1,16 +1,33 @@
+import csv
+import io
+import json
+from collections import defaultdict, deque
 from datetime import date
-from typing import List
+from enum import Enum
+from typing import AsyncIterator, Dict, Hashable, List, Optional
 from fastapi import HTTPException, status
+from sqlalchemy import insert
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.core.db import AsyncController, get_async_engine
+from backend.core.occupancy import occupancy_index
+from backend.core.pagination import Keyset
+from backend.core.summary import lock_room_days, refresh_room_days
 from backend.models.users.UsersModel import User
-from backend.models.rooms.RoomsModel import Room
-from backend.models.reservations.ReservationsModel import Reservation, ReservationRead, ReservationReadWithDetails, ReservationCreate, EstadoReservaEnum
+from backend.models.rooms.RoomsModel import Room, SedeEnum, mask_to_recursos
+from backend.models.reservations.ReservationsModel import (
+    Reservation, ReservationRead, ReservationCreate, EstadoReservaEnum,
+    ReservationBulkItemResult, ReservationBulkResult, ExportFormatEnum,
+)
 
 class ReservationsController:
+    keyset = Keyset(Reservation.fecha, Reservation.hora_inicio, Reservation.id)
+    MAX_BULK_ITEMS = 500
+
     def __init__(self, session):
         self.session = session
 
-    def _ensure_user_and_room(self, usuario_id: int, sala_id: int) -> None:
+    def ensure_user_and_room(self, usuario_id: int, sala_id: int) -> None:
         if not self.session.get(User, usuario_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -22,7 +39,7 @@ class ReservationsController:
                 detail="Sala no encontrada",
             )
 
-    def _validate_time_range(self, hora_inicio, hora_fin) -> None:
+    def validate_time_range(self, hora_inicio, hora_fin) -> None:
         from datetime import datetime, timedelta
         if hora_fin <= hora_inicio:
             raise HTTPException(
@@ -42,48 +59,101 @@ class ReservationsController:
                 detail="Las reservas deben ser de exactamente 1 hora",
             )
 
-    def list_reservations(self, skip: int = 0, limit: int = 100) -> List[ReservationRead]:
+    def _claim_slot(self, reservation: Reservation, previous) -> None:
+        """Record the reservation in the occupancy index, or fail with 409 if the slot is taken"""
+        if reservation.estado == EstadoReservaEnum.cancelada:
+            occupancy_index.release(reservation.id)
+            return
+
+        if not occupancy_index.claim(
+            self.session,
+            reservation.id,
+            reservation.sala_id,
+            reservation.fecha,
+            reservation.hora_inicio,
+            reservation.hora_fin,
+        ):
+            occupancy_index.restore(reservation.id, previous)
+            self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La sala ya está reservada en ese horario",
+            )
+
+    def _commit_slot(self, reservation: Reservation, previous, days=()) -> None:
+        """
+        Refresh the room-day summaries (the reservation's own plus `days`) and
+        commit, putting the occupancy index back as it was if that fails. The
+        caller locks those days with lock_room_days() before changing the row.
+        """
+        try:
+            refresh_room_days(self.session, {(reservation.sala_id, reservation.fecha), *days})
+            self.session.commit()
+        except Exception:
+            occupancy_index.restore(reservation.id, previous)
+            raise
+
+    def list_reservations(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[ReservationRead]:
         reservations = self.session.exec(
-            select(Reservation).offset(skip).limit(limit)
+            self.keyset.apply(select(Reservation), skip=skip, limit=limit, cursor=cursor)
         ).all()
         return [ReservationRead.model_validate(r) for r in reservations]
 
-    def list_reservations_with_details(self, skip: int = 0, limit: int = 100) -> List[ReservationReadWithDetails]:
-        """Get reservations with user and room details using manual joins"""
-        reservations = self.session.exec(
-            select(Reservation).offset(skip).limit(limit)
+    # Columns of the detail listings, read as plain rows: no ORM objects or
+    # Pydantic models are built, each row goes straight into a dict
+    _detail_columns = (
+        Reservation.id, Reservation.usuario_id, Reservation.sala_id, Reservation.fecha,
+        Reservation.hora_inicio, Reservation.hora_fin, Reservation.estado, Reservation.serie_id,
+        User.id, User.nombre, User.email, User.rol,
+        Room.id, Room.nombre, Room.sede, Room.capacidad, Room.recursos_mask,
+    )
+    _reservation_fields = [c.key for c in _detail_columns[:8]]
+
+    def load_with_details(
+        self, *criteria, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Load reservations together with their user and room in a single joined
+        query, as dicts shaped like ReservationReadWithDetails
+        """
+        query = (
+            select(*self._detail_columns)
+            .outerjoin(User, User.id == Reservation.usuario_id)
+            .outerjoin(Room, Room.id == Reservation.sala_id)
+            .where(*criteria)
+        )
+        rows = self.session.exec(
+            self.keyset.apply(query, skip=skip, limit=limit, cursor=cursor)
         ).all()
-        
+
+        fields = self._reservation_fields
         result = []
-        for reservation in reservations:
-            # Get user details
-            user = self.session.get(User, reservation.usuario_id)
-            user_dict = {
-                "id": user.id,
-                "nombre": user.nombre,
-                "email": user.email,
-                "rol": user.rol
-            } if user else None
-            
-            # Get room details
-            room = self.session.get(Room, reservation.sala_id)
-            room_dict = {
-                "id": room.id,
-                "nombre": room.nombre,
-                "sede": room.sede,
-                "capacidad": room.capacidad,
-                "recursos": room.recursos
-            } if room else None
-            
-            reservation_data = ReservationRead.model_validate(reservation)
-            result.append(ReservationReadWithDetails(
-                **reservation_data.model_dump(),
-                usuario=user_dict,
-                sala=room_dict
-            ))
-        
+        for row in rows:
+            item = dict(zip(fields, row[:8]))
+            user_id, nombre, email, rol = row[8:12]
+            item["usuario"] = {
+                "id": user_id,
+                "nombre": nombre,
+                "email": email,
+                "rol": rol
+            } if user_id is not None else None
+
+            room_id, nombre, sede, capacidad, recursos_mask = row[12:]
+            item["sala"] = {
+                "id": room_id,
+                "nombre": nombre,
+                "sede": sede,
+                "capacidad": capacidad,
+                "recursos": mask_to_recursos(recursos_mask)
+            } if room_id is not None else None
+            result.append(item)
+
         return result
 
+    def list_reservations_with_details(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        """Get reservations with user and room details"""
+        return self.load_with_details(skip=skip, limit=limit, cursor=cursor)
+
     def get_reservation(self, reservation_id: int) -> ReservationRead:
         reservation = self.session.get(Reservation, reservation_id)
         if not reservation:
@@ -93,15 +163,144 @@ class ReservationsController:
         return ReservationRead.model_validate(reservation)
 
     def create_reservation(self, data: ReservationCreate) -> ReservationRead:
-        self._ensure_user_and_room(data.usuario_id, data.sala_id)
-        self._validate_time_range(data.hora_inicio, data.hora_fin)
+        self.ensure_user_and_room(data.usuario_id, data.sala_id)
+        self.validate_time_range(data.hora_inicio, data.hora_fin)
 
+        lock_room_days(self.session, [(data.sala_id, data.fecha)])
         reservation = Reservation(**data.model_dump())
         self.session.add(reservation)
-        self.session.commit()
+        self.session.flush()
+
+        self._claim_slot(reservation, None)
+        self._commit_slot(reservation, None)
         self.session.refresh(reservation)
         return ReservationRead.model_validate(reservation)
 
+    def create_reservations_bulk(
+        self, items: List[ReservationCreate], serie_id: Optional[int] = None
+    ) -> ReservationBulkResult:
+        """
+        Create many reservations in one transaction. Every item is validated on
+        its own; the valid ones are inserted together and the result reports,
+        position by position, which were created and why the others were not.
+        """
+        if len(items) > self.MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Se permiten como máximo {self.MAX_BULK_ITEMS} reservas por lote",
+            )
+
+        results: List[Optional[ReservationBulkItemResult]] = [None] * len(items)
+
+        def fail(index: int, status_code: int, detail: str) -> None:
+            results[index] = ReservationBulkItemResult(
+                index=index, fecha=items[index].fecha, ok=False, status_code=status_code, error=detail
+            )
+
+        user_ids = {item.usuario_id for item in items}
+        room_ids = {item.sala_id for item in items}
+        existing_users = set(self.session.exec(select(User.id).where(User.id.in_(user_ids))).all()) if user_ids else set()
+        existing_rooms = set(self.session.exec(select(Room.id).where(Room.id.in_(room_ids))).all()) if room_ids else set()
+        occupancy_index.ensure_loaded_many(self.session, {item.fecha for item in items})
+
+        # Slots are claimed under provisional keys until the rows have ids, so
+        # items of the same batch are checked against each other as well
+        batch = object()
+        claimed: Dict[int, Hashable] = {}
+        accepted: List[int] = []
+        try:
+            for i, item in enumerate(items):
+                if item.usuario_id not in existing_users:
+                    fail(i, status.HTTP_404_NOT_FOUND, "Usuario no encontrado")
+                    continue
+                if item.sala_id not in existing_rooms:
+                    fail(i, status.HTTP_404_NOT_FOUND, "Sala no encontrada")
+                    continue
+                try:
+                    self.validate_time_range(item.hora_inicio, item.hora_fin)
+                except HTTPException as e:
+                    fail(i, e.status_code, e.detail)
+                    continue
+                if item.estado != EstadoReservaEnum.cancelada:
+                    if not occupancy_index.claim(
+                        self.session, (batch, i), item.sala_id, item.fecha, item.hora_inicio, item.hora_fin
+                    ):
+                        fail(i, status.HTTP_409_CONFLICT, "La sala ya está reservada en ese horario")
+                        continue
+                    claimed[i] = (batch, i)
+                accepted.append(i)
+
+            if serie_id is not None and not accepted:
+                # Nothing to book: the caller's series is not saved on its own
+                self.session.rollback()
+                return ReservationBulkResult(created=0, failed=len(items), results=results)
+
+            rows = [{**items[i].model_dump(), "serie_id": serie_id} for i in accepted]
+            lock_room_days(self.session, {(row["sala_id"], row["fecha"]) for row in rows})
+            ids = self._insert_many(rows)
+            for i, reservation_id, row in zip(accepted, ids, rows):
+                if i in claimed:
+                    occupancy_index.rekey(claimed[i], reservation_id)
+                    claimed[i] = reservation_id
+                results[i] = ReservationBulkItemResult(
+                    index=i,
+                    fecha=row["fecha"],
+                    ok=True,
+                    status_code=status.HTTP_201_CREATED,
+                    reservation=ReservationRead(id=reservation_id, **row),
+                )
+            refresh_room_days(self.session, {(row["sala_id"], row["fecha"]) for row in rows})
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            for key in claimed.values():
+                occupancy_index.release(key)
+            raise
+
+        return ReservationBulkResult(
+            created=len(accepted),
+            failed=len(items) - len(accepted),
+            results=results,
+        )
+
+    def _insert_many(self, rows: List[dict]) -> List[int]:
+        """Insert the rows with one multi-row statement and return their ids in order"""
+        if not rows:
+            return []
+
+        dialect = self.session.get_bind().dialect
+        if dialect.insert_returning and dialect.use_insertmanyvalues:
+            # RETURNING does not promise row order, so ids are matched back by slot
+            slot = (Reservation.sala_id, Reservation.fecha, Reservation.hora_inicio, Reservation.usuario_id)
+            inserted = self.session.execute(insert(Reservation).returning(Reservation.id, *slot), rows).all()
+            found = defaultdict(deque)
+            for reservation_id, *key in sorted(inserted):
+                found[tuple(key)].append(reservation_id)
+            return [found[tuple(r[c.key] for c in slot)].popleft() for r in rows]
+
+        if dialect.name == "mysql" and self._consecutive_autoinc():
+            # One multi-row INSERT: LAST_INSERT_ID() is the id of its first row
+            # and InnoDB gives the rest consecutive ids in row order
+            first = self.session.execute(insert(Reservation).values(rows)).lastrowid
+            return list(range(first, first + len(rows)))
+
+        # Ids of a multi-row INSERT may interleave with concurrent inserts: one row at a time
+        return [self.session.execute(insert(Reservation).values(**row)).inserted_primary_key[0] for row in rows]
+
+    def _consecutive_autoinc(self) -> bool:
+        """
+        Whether InnoDB reserves the ids of a multi-row INSERT as one block:
+        innodb_autoinc_lock_mode 0 (traditional) or 1 (consecutive). Under 2
+        (interleaved, the MySQL 8 default) another transaction's rows can take
+        ids in between. Read once per connection.
+        """
+        info = self.session.connection().info
+        if "autoinc_lock_mode" not in info:
+            info["autoinc_lock_mode"] = int(self.session.connection().exec_driver_sql(
+                "SELECT @@innodb_autoinc_lock_mode"
+            ).scalar())
+        return info["autoinc_lock_mode"] in (0, 1)
+
     def update_reservation(self, reservation_id: int, data) -> ReservationRead:
         reservation = self.session.get(Reservation, reservation_id)
         if not reservation:
@@ -114,22 +313,28 @@ class ReservationsController:
         # Validate foreign keys if being updated
         usuario_id = update_data.get("usuario_id", reservation.usuario_id)
         sala_id = update_data.get("sala_id", reservation.sala_id)
-        self._ensure_user_and_room(usuario_id, sala_id)
+        self.ensure_user_and_room(usuario_id, sala_id)
 
         # Validate time range if either time is provided
         hora_inicio = update_data.get("hora_inicio", reservation.hora_inicio)
         hora_fin = update_data.get("hora_fin", reservation.hora_fin)
-        self._validate_time_range(hora_inicio, hora_fin)
+        self.validate_time_range(hora_inicio, hora_fin)
+
+        previous = occupancy_index.snapshot(self.session, reservation.id, reservation.fecha)
+        old_day = (reservation.sala_id, reservation.fecha)
+        lock_room_days(self.session, [old_day, (sala_id, update_data.get("fecha", reservation.fecha))])
 
         for k, v in update_data.items():
             setattr(reservation, k, v)
 
+        self._claim_slot(reservation, previous)
+
         self.session.add(reservation)
-        self.session.commit()
+        self._commit_slot(reservation, previous, [old_day])
         self.session.refresh(reservation)
         return ReservationRead.model_validate(reservation)
 
-    def get_reservations_by_user(self, usuario_id: int, skip: int = 0, limit: int = 100) -> List[ReservationReadWithDetails]:
+    def get_reservations_by_user(self, usuario_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
         """Get all reservations for a specific user"""
         # First check if user exists
         if not self.session.get(User, usuario_id):
@@ -138,44 +343,11 @@ class ReservationsController:
                 detail="Usuario no encontrado",
             )
         
-        reservations = self.session.exec(
-            select(Reservation)
-            .where(Reservation.usuario_id == usuario_id)
-            .offset(skip)
-            .limit(limit)
-        ).all()
-        
-        result = []
-        for reservation in reservations:
-            # Get user details
-            user = self.session.get(User, reservation.usuario_id)
-            user_dict = {
-                "id": user.id,
-                "nombre": user.nombre,
-                "email": user.email,
-                "rol": user.rol
-            } if user else None
-            
-            # Get room details
-            room = self.session.get(Room, reservation.sala_id)
-            room_dict = {
-                "id": room.id,
-                "nombre": room.nombre,
-                "sede": room.sede,
-                "capacidad": room.capacidad,
-                "recursos": room.recursos
-            } if room else None
-            
-            reservation_data = ReservationRead.model_validate(reservation)
-            result.append(ReservationReadWithDetails(
-                **reservation_data.model_dump(),
-                usuario=user_dict,
-                sala=room_dict
-            ))
-        
-        return result
+        return self.load_with_details(
+            Reservation.usuario_id == usuario_id, skip=skip, limit=limit, cursor=cursor
+        )
 
-    def get_reservations_by_room(self, sala_id: int, skip: int = 0, limit: int = 100) -> List[ReservationReadWithDetails]:
+    def get_reservations_by_room(self, sala_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
         """Get all reservations for a specific room"""
         # First check if room exists
         if not self.session.get(Room, sala_id):
@@ -184,81 +356,15 @@ class ReservationsController:
                 detail="Sala no encontrada",
             )
         
-        reservations = self.session.exec(
-            select(Reservation)
-            .where(Reservation.sala_id == sala_id)
-            .offset(skip)
-            .limit(limit)
-        ).all()
-        
-        result = []
-        for reservation in reservations:
-            # Get user details
-            user = self.session.get(User, reservation.usuario_id)
-            user_dict = {
-                "id": user.id,
-                "nombre": user.nombre,
-                "email": user.email,
-                "rol": user.rol
-            } if user else None
-            
-            # Get room details
-            room = self.session.get(Room, reservation.sala_id)
-            room_dict = {
-                "id": room.id,
-                "nombre": room.nombre,
-                "sede": room.sede,
-                "capacidad": room.capacidad,
-                "recursos": room.recursos
-            } if room else None
-            
-            reservation_data = ReservationRead.model_validate(reservation)
-            result.append(ReservationReadWithDetails(
-                **reservation_data.model_dump(),
-                usuario=user_dict,
-                sala=room_dict
-            ))
-        
-        return result
+        return self.load_with_details(
+            Reservation.sala_id == sala_id, skip=skip, limit=limit, cursor=cursor
+        )
 
-    def get_reservations_by_date(self, fecha: date, skip: int = 0, limit: int = 100) -> List[ReservationReadWithDetails]:
+    def get_reservations_by_date(self, fecha: date, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
         """Get all reservations for a specific date"""
-        reservations = self.session.exec(
-            select(Reservation)
-            .where(Reservation.fecha == fecha)
-            .offset(skip)
-            .limit(limit)
-        ).all()
-        
-        result = []
-        for reservation in reservations:
-            # Get user details
-            user = self.session.get(User, reservation.usuario_id)
-            user_dict = {
-                "id": user.id,
-                "nombre": user.nombre,
-                "email": user.email,
-                "rol": user.rol
-            } if user else None
-            
-            # Get room details
-            room = self.session.get(Room, reservation.sala_id)
-            room_dict = {
-                "id": room.id,
-                "nombre": room.nombre,
-                "sede": room.sede,
-                "capacidad": room.capacidad,
-                "recursos": room.recursos
-            } if room else None
-            
-            reservation_data = ReservationRead.model_validate(reservation)
-            result.append(ReservationReadWithDetails(
-                **reservation_data.model_dump(),
-                usuario=user_dict,
-                sala=room_dict
-            ))
-        
-        return result
+        return self.load_with_details(
+            Reservation.fecha == fecha, skip=skip, limit=limit, cursor=cursor
+        )
 
     def cancel_reservation(self, reservation_id: int) -> ReservationRead:
         """Cancel a reservation by setting its status to 'cancelada'"""
@@ -275,8 +381,103 @@ class ReservationsController:
                 detail="La reserva ya está cancelada"
             )
         
+        previous = occupancy_index.snapshot(self.session, reservation.id, reservation.fecha)
+        lock_room_days(self.session, [(reservation.sala_id, reservation.fecha)])
+
         reservation.estado = "cancelada"
         self.session.add(reservation)
-        self.session.commit()
+        occupancy_index.release(reservation.id)
+        self._commit_slot(reservation, previous)
         self.session.refresh(reservation)
-        return ReservationRead.model_validate(reservation)
\ No newline at end of file
+        return ReservationRead.model_validate(reservation)
+
+class AsyncReservationsController(AsyncController):
+    controller_class = ReservationsController
+
+class ReservationsExporter:
+    """
+    Streams reservations as CSV or NDJSON straight from a server-side cursor:
+    rows are fetched and written CHUNK_ROWS at a time, so memory use does not
+    depend on how many rows are exported.
+    """
+
+    CHUNK_ROWS = 1000
+
+    columns = (
+        Reservation.id,
+        Reservation.fecha,
+        Reservation.hora_inicio,
+        Reservation.hora_fin,
+        Reservation.estado,
+        Reservation.usuario_id,
+        User.nombre.label("usuario_nombre"),
+        User.email.label("usuario_email"),
+        Reservation.sala_id,
+        Room.nombre.label("sala_nombre"),
+        Room.sede,
+        Reservation.serie_id,
+    )
+    fields = [c.key for c in columns]
+
+    media_types = {
+        ExportFormatEnum.csv: "text/csv; charset=utf-8",
+        ExportFormatEnum.ndjson: "application/x-ndjson",
+    }
+
+    def __init__(self, desde: Optional[date] = None, hasta: Optional[date] = None, sede: Optional[SedeEnum] = None):
+        if desde and hasta and hasta < desde:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha 'hasta' no puede ser anterior a 'desde'",
+            )
+        self.desde = desde
+        self.hasta = hasta
+        self.sede = sede
+
+    def query(self):
+        query = (
+            select(*self.columns)
+            .join(User, User.id == Reservation.usuario_id)
+            .join(Room, Room.id == Reservation.sala_id)
+            .order_by(Reservation.fecha, Reservation.hora_inicio, Reservation.id)
+        )
+        if self.desde:
+            query = query.where(Reservation.fecha >= self.desde)
+        if self.hasta:
+            query = query.where(Reservation.fecha <= self.hasta)
+        if self.sede:
+            query = query.where(Room.sede == self.sede)
+        return query
+
+    @staticmethod
+    def _plain(value):
+        if isinstance(value, Enum):
+            return value.value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+    def _csv(self, rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([[self._plain(v) for v in row] for row in rows])
+        return buffer.getvalue()
+
+    def _ndjson(self, rows) -> str:
+        return "".join(
+            json.dumps(dict(zip(self.fields, (self._plain(v) for v in row))), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    async def stream(self, format: ExportFormatEnum) -> AsyncIterator[str]:
+        # The request's session is closed once the handler returns, before the
+        # body is sent, so the stream opens and owns its own session
+        write = self._csv if format == ExportFormatEnum.csv else self._ndjson
+        if format == ExportFormatEnum.csv:
+            yield self._csv([self.fields])
+
+        async with AsyncSession(get_async_engine()) as session:
+            result = await session.stream(
+                self.query().execution_options(yield_per=self.CHUNK_ROWS)
+            )
+            async for rows in result.partitions():
+                yield write(rows)
@@ -1,35 +1,124 @@
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
 
+from backend.core.catalog import room_catalog
+from backend.core.db import AsyncController
+from backend.core.occupancy import occupancy_index
+from backend.core.pagination import Keyset
 from backend.models.rooms.RoomsModel import *
 
 class RoomsController:
+    keyset = Keyset(Room.id)
+
     def __init__(self, session: Session):
         self.session = session
 
+    def _resource_masks(
+        self,
+        recurso: Optional[str] = None,
+        recursos: Optional[str] = None,
+        recursos_alguno: Optional[str] = None,
+    ) -> Tuple[int, int]:
+        """(has-all, has-any) resource masks of the filters; 0 means no filter"""
+        try:
+            todos = ','.join(r for r in (recurso, recursos) if r)
+            todos_mask = recursos_to_mask(parse_recursos(todos).split(',')) if todos else 0
+            alguno_mask = recursos_to_mask(parse_recursos(recursos_alguno).split(',')) if recursos_alguno else 0
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        return todos_mask, alguno_mask
+
+    def _filter_resources(self, query, todos_mask: int, alguno_mask: int):
+        # The qualifying masks are enumerated so the filter is an indexable IN, not a bitwise expression
+        if todos_mask:
+            query = query.where(Room.recursos_mask.in_(masks_with_all(todos_mask)))
+        if alguno_mask:
+            query = query.where(Room.recursos_mask.in_(masks_with_any(alguno_mask)))
+        return query
+
     def list_rooms(
         self, 
         skip: int = 0, 
         limit: int = 100,
         sede: Optional[SedeEnum] = None,
-        recurso: Optional[str] = None
+        recurso: Optional[str] = None,
+        cursor: Optional[str] = None,
+        recursos: Optional[str] = None,
+        recursos_alguno: Optional[str] = None
     ) -> List[RoomRead]:
+        todos_mask, alguno_mask = self._resource_masks(recurso, recursos, recursos_alguno)
+        if room_catalog.enabled:
+            rooms = room_catalog.find(
+                self.session, sede=sede, recursos_todos=todos_mask, recursos_alguno=alguno_mask
+            )
+            return self.keyset.page(rooms, skip=skip, limit=limit, cursor=cursor)
+
         query = select(Room)
         
         # Filter by sede if provided
         if sede:
             query = query.where(Room.sede == sede)
         
-        # Filter by recurso if provided (check if the room has this resource)
-        if recurso:
-            query = query.where(Room.recursos.contains(recurso))
+        # Filter by resources if provided
+        query = self._filter_resources(query, todos_mask, alguno_mask)
         
-        rooms = self.session.exec(query.offset(skip).limit(limit)).all()
+        rooms = self.session.exec(
+            self.keyset.apply(query, skip=skip, limit=limit, cursor=cursor)
+        ).all()
         return [RoomRead.model_validate(r) for r in rooms]
 
+    def list_available_rooms(
+        self,
+        fecha: date,
+        hora_inicio: time,
+        sede: Optional[SedeEnum] = None,
+        capacidad_min: Optional[int] = None,
+        recurso: Optional[str] = None,
+        recursos: Optional[str] = None,
+        recursos_alguno: Optional[str] = None
+    ) -> List[RoomRead]:
+        """Rooms matching the filters that are free for the one-hour slot starting at hora_inicio"""
+        fin_dt = datetime.combine(fecha, hora_inicio) + timedelta(hours=1)
+        if fin_dt.date() != fecha:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La reserva debe terminar el mismo día",
+            )
+
+        todos_mask, alguno_mask = self._resource_masks(recurso, recursos, recursos_alguno)
+        busy = occupancy_index.busy_rooms(self.session, fecha, hora_inicio, fin_dt.time())
+        if room_catalog.enabled:
+            rooms = room_catalog.find(
+                self.session,
+                sede=sede,
+                recursos_todos=todos_mask,
+                recursos_alguno=alguno_mask,
+                capacidad_min=capacidad_min,
+            )
+            return [r for r in rooms if r.id not in busy]
+
+        query = select(Room)
+        if sede:
+            query = query.where(Room.sede == sede)
+        if capacidad_min:
+            query = query.where(Room.capacidad >= capacidad_min)
+        query = self._filter_resources(query, todos_mask, alguno_mask)
+
+        rooms = self.session.exec(query).all()
+        return [RoomRead.model_validate(r) for r in rooms if r.id not in busy]
+
     def get_room(self, room_id: int) -> RoomRead:
+        if room_catalog.enabled:
+            room = room_catalog.get(self.session, room_id)
+            if not room:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada"
+                )
+            return room
+
         room = self.session.get(Room, room_id)
         if not room:
             raise HTTPException(
@@ -73,6 +162,7 @@ class RoomsController:
         room = Room(**data.model_dump())
         self.session.add(room)
         self.session.commit()
+        room_catalog.invalidate()
         self.session.refresh(room)
         return RoomRead.model_validate(room)
 
@@ -82,11 +172,12 @@ class RoomsController:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Sala no encontrada"
             )
-        update_data = data.model_dump(exclude_unset=True)
+        update_data = data.model_dump(exclude_unset=True, exclude_none=True)
         for k, v in update_data.items():
             setattr(room, k, v)
         self.session.add(room)
         self.session.commit()
+        room_catalog.invalidate()
         self.session.refresh(room)
         return RoomRead.model_validate(room)
 
@@ -111,4 +202,7 @@ class RoomsController:
         
         self.session.delete(room)
         self.session.commit()
-        
\ No newline at end of file
+        room_catalog.invalidate()
+
+class AsyncRoomsController(AsyncController):
+    controller_class = RoomsController
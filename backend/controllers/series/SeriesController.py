@@ -0,0 +1,255 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlmodel import select, update
+from backend.core.db import AsyncController
+from backend.core.occupancy import occupancy_index
+from backend.core.pagination import Keyset
+from backend.core.summary import lock_room_days, refresh_room_days
+from backend.controllers.reservations.ReservationsController import ReservationsController
+from backend.models.rooms.RoomsModel import Room
+from backend.models.reservations.ReservationsModel import (
+    Reservation, ReservationCreate, EstadoReservaEnum,
+)
+from backend.models.series.SeriesModel import (
+    ReservationSeries, ReservationSeriesBase, ReservationSeriesCreate, ReservationSeriesRead,
+    ReservationSeriesUpdate, ReservationSeriesCreated, ReservationSeriesChange,
+    FrecuenciaEnum, EstadoSerieEnum,
+)
+
+def expand_dates(rule: ReservationSeriesBase, max_dates: int) -> List[date]:
+    """Dates generated by a series rule, in order; 400 if there are more than max_dates"""
+    weekdays = sorted(set(rule.get_weekdays()))
+    dates: List[date] = []
+
+    if rule.frecuencia == FrecuenciaEnum.diaria:
+        current = rule.fecha_inicio
+        while current <= rule.fecha_fin and len(dates) <= max_dates:
+            if not rule.dias_semana or current.weekday() in weekdays:
+                dates.append(current)
+            current += timedelta(days=rule.intervalo)
+    else:
+        # Weeks are counted from the Monday of the week of fecha_inicio
+        week = rule.fecha_inicio - timedelta(days=rule.fecha_inicio.weekday())
+        while week <= rule.fecha_fin and len(dates) <= max_dates:
+            for weekday in weekdays:
+                current = week + timedelta(days=weekday)
+                if rule.fecha_inicio <= current <= rule.fecha_fin:
+                    dates.append(current)
+            week += timedelta(weeks=rule.intervalo)
+
+    if len(dates) > max_dates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"La serie genera más de {max_dates} reservas",
+        )
+    return dates
+
+class SeriesController:
+    keyset = Keyset(ReservationSeries.id)
+
+    def __init__(self, session):
+        self.session = session
+        self.reservations = ReservationsController(session)
+
+    def _get_series(self, serie_id: int) -> ReservationSeries:
+        serie = self.session.get(ReservationSeries, serie_id)
+        if not serie:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Serie no encontrada"
+            )
+        return serie
+
+    def _active_from(self, serie_id: int, desde: Optional[date]) -> list:
+        """Criteria of the series' reservations still active from `desde` (today by default)"""
+        return [
+            Reservation.serie_id == serie_id,
+            Reservation.estado != EstadoReservaEnum.cancelada,
+            Reservation.fecha >= (desde or date.today()),
+        ]
+
+    def list_series(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[ReservationSeriesRead]:
+        series = self.session.exec(
+            self.keyset.apply(select(ReservationSeries), skip=skip, limit=limit, cursor=cursor)
+        ).all()
+        return [ReservationSeriesRead.model_validate(s) for s in series]
+
+    def get_series(self, serie_id: int) -> ReservationSeriesRead:
+        return ReservationSeriesRead.model_validate(self._get_series(serie_id))
+
+    def get_series_reservations(
+        self, serie_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[dict]:
+        self._get_series(serie_id)
+        return self.reservations.load_with_details(
+            Reservation.serie_id == serie_id, skip=skip, limit=limit, cursor=cursor
+        )
+
+    def create_series(self, data: ReservationSeriesCreate) -> ReservationSeriesCreated:
+        """
+        Create the series and all its reservations in one batch; taken dates are
+        reported, not booked. 409, and nothing saved, when no date is free.
+        """
+        self.reservations.ensure_user_and_room(data.usuario_id, data.sala_id)
+        self.reservations.validate_time_range(data.hora_inicio, data.hora_fin)
+        if data.fecha_fin < data.fecha_inicio:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La fecha de fin de la serie no puede ser anterior a la de inicio",
+            )
+
+        fechas = expand_dates(data, ReservationsController.MAX_BULK_ITEMS)
+        if not fechas:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La regla de la serie no genera ninguna fecha",
+            )
+
+        serie = ReservationSeries(**data.model_dump())
+        self.session.add(serie)
+        self.session.flush()
+
+        # Commits the series together with its reservations, or rolls it back if none was booked
+        result = self.reservations.create_reservations_bulk(
+            [
+                ReservationCreate(
+                    fecha=fecha,
+                    hora_inicio=data.hora_inicio,
+                    hora_fin=data.hora_fin,
+                    usuario_id=data.usuario_id,
+                    sala_id=data.sala_id,
+                )
+                for fecha in fechas
+            ],
+            serie_id=serie.id,
+        )
+        if result.created == 0:
+            # Every date was taken
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={
+                    "message": "La serie no genera ninguna reserva disponible",
+                    "failed": [
+                        {"fecha": item.fecha.isoformat(), "status_code": item.status_code, "error": item.error}
+                        for item in result.results
+                    ],
+                },
+            )
+        self.session.refresh(serie)
+        return ReservationSeriesCreated(
+            serie=ReservationSeriesRead.model_validate(serie),
+            created=result.created,
+            failed=result.failed,
+            results=result.results,
+        )
+
+    def update_series(
+        self, serie_id: int, data: ReservationSeriesUpdate, desde: Optional[date] = None
+    ) -> ReservationSeriesChange:
+        """Move the room and/or hours of every active reservation of the series with one UPDATE"""
+        serie = self._get_series(serie_id)
+        if serie.estado == EstadoSerieEnum.cancelada:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La serie está cancelada",
+            )
+
+        changes = data.model_dump(exclude_unset=True, exclude_none=True)
+        if not changes:
+            return ReservationSeriesChange(serie=ReservationSeriesRead.model_validate(serie), affected=0)
+
+        sala_id = changes.get("sala_id", serie.sala_id)
+        hora_inicio = changes.get("hora_inicio", serie.hora_inicio)
+        hora_fin = changes.get("hora_fin", serie.hora_fin)
+        if "sala_id" in changes and not self.session.get(Room, sala_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sala no encontrada",
+            )
+        self.reservations.validate_time_range(hora_inicio, hora_fin)
+
+        criteria = self._active_from(serie_id, desde)
+        rows = self.session.exec(select(Reservation.id, Reservation.sala_id, Reservation.fecha).where(*criteria)).all()
+        days = {(old_sala, fecha) for _, old_sala, fecha in rows} | {(sala_id, fecha) for _, _, fecha in rows}
+        lock_room_days(self.session, days)
+
+        # Check every occurrence against the new slot in memory before touching the table
+        occupancy_index.ensure_loaded_many(self.session, {fecha for _, _, fecha in rows})
+        previous = {rid: occupancy_index.snapshot(self.session, rid, fecha) for rid, _, fecha in rows}
+        claimed: List[int] = []
+        conflicts: List[date] = []
+        for rid, _, fecha in rows:
+            if occupancy_index.claim(self.session, rid, sala_id, fecha, hora_inicio, hora_fin):
+                claimed.append(rid)
+            else:
+                conflicts.append(fecha)
+
+        def restore_claims() -> None:
+            for rid in claimed:
+                occupancy_index.restore(rid, previous[rid])
+
+        if conflicts:
+            restore_claims()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"La sala ya está reservada en ese horario: {', '.join(f.isoformat() for f in conflicts)}",
+            )
+
+        try:
+            result = self.session.exec(
+                update(Reservation)
+                .where(*criteria)
+                .values(sala_id=sala_id, hora_inicio=hora_inicio, hora_fin=hora_fin)
+                .execution_options(synchronize_session=False)
+            )
+            refresh_room_days(self.session, days)
+            for key, value in changes.items():
+                setattr(serie, key, value)
+            self.session.add(serie)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            restore_claims()
+            raise
+
+        self.session.refresh(serie)
+        return ReservationSeriesChange(serie=ReservationSeriesRead.model_validate(serie), affected=result.rowcount)
+
+    def cancel_series(self, serie_id: int, desde: Optional[date] = None) -> ReservationSeriesChange:
+        """Cancel the series and, with one UPDATE, its reservations from `desde` on"""
+        serie = self._get_series(serie_id)
+        if serie.estado == EstadoSerieEnum.cancelada:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La serie ya está cancelada",
+            )
+
+        criteria = self._active_from(serie_id, desde)
+        rows = self.session.exec(select(Reservation.id, Reservation.sala_id, Reservation.fecha).where(*criteria)).all()
+        days = {(sala, fecha) for _, sala, fecha in rows}
+        lock_room_days(self.session, days)
+
+        try:
+            result = self.session.exec(
+                update(Reservation)
+                .where(*criteria)
+                .values(estado=EstadoReservaEnum.cancelada)
+                .execution_options(synchronize_session=False)
+            )
+            refresh_room_days(self.session, days)
+            serie.estado = EstadoSerieEnum.cancelada
+            self.session.add(serie)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        # Freed only once committed: until then the slots still count as taken
+        for rid, _, _ in rows:
+            occupancy_index.release(rid)
+
+        self.session.refresh(serie)
+        return ReservationSeriesChange(serie=ReservationSeriesRead.model_validate(serie), affected=result.rowcount)
+
+class AsyncSeriesController(AsyncController):
+    controller_class = SeriesController
@@ -3,14 +3,20 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
 
+from backend.core.db import AsyncController
+from backend.core.pagination import Keyset
 from backend.models.users.UsersModel import *
 
 class UsersController:
+    keyset = Keyset(User.id)
+
     def __init__(self, session: Session):
         self.session = session
 
-    def list_users(self, skip: int = 0, limit: int = 100) -> List[UserRead]:
-        users = self.session.exec(select(User).offset(skip).limit(limit)).all()
+    def list_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[UserRead]:
+        users = self.session.exec(
+            self.keyset.apply(select(User), skip=skip, limit=limit, cursor=cursor)
+        ).all()
         return [UserRead.model_validate(u) for u in users]
 
     def get_user(self, user_id: int) -> UserRead:
@@ -113,4 +119,7 @@ class UsersController:
             )
         
         self.session.delete(user)
-        self.session.commit()
\ No newline at end of file
+        self.session.commit()
+
+class AsyncUsersController(AsyncController):
+    controller_class = UsersController
@@ -0,0 +1,44 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from backend.core.metrics import cache_hit, cache_miss
+
+class TTLCache:
+    """Small bounded LRU whose entries also expire `ttl` seconds after being stored"""
+
+    def __init__(self, ttl: float, maxsize: int = 128, name: str = "ttl"):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                cache_miss(self.name)
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                cache_miss(self.name)
+                return None
+            self._entries.move_to_end(key)
+            cache_hit(self.name)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
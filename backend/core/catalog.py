@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import Session, select
+
+from backend.core.metrics import cache_hit, cache_miss
+from backend.models.rooms.RoomsModel import RECURSO_BITS, Room, RoomRead, SedeEnum
+
+class _Snapshot:
+    """Immutable view of the whole room table, swapped in one assignment"""
+
+    def __init__(self, rooms: List[Room], loaded_at: float):
+        self.loaded_at = loaded_at
+        self.rooms = [RoomRead.model_validate(r) for r in rooms]  # ordered by id, like the paginated listing
+        self.by_id: Dict[int, RoomRead] = {r.id: r for r in self.rooms}
+        self.by_sede: Dict[SedeEnum, List[RoomRead]] = {}
+        for room in self.rooms:
+            self.by_sede.setdefault(room.sede, []).append(room)
+        # Resource bit -> ids of the rooms that have it
+        self.by_recurso: Dict[int, Set[int]] = {
+            bit: {r.id for r in rooms if r.recursos_mask & bit} for bit in RECURSO_BITS.values()
+        }
+
+    def with_resources(self, todos: int, alguno: int) -> Set[int]:
+        """Ids of the rooms having every bit of `todos` and at least one bit of `alguno`"""
+        ids = set(self.by_id)
+        for bit, owners in self.by_recurso.items():
+            if todos & bit:
+                ids &= owners
+        if alguno:
+            ids &= set().union(*(owners for bit, owners in self.by_recurso.items() if alguno & bit))
+        return ids
+
+class RoomCatalog:
+    """
+    Process-local read-through cache of the room catalog, indexed by id, sede
+    and resource. Room writes call invalidate(); the TTL bounds how long another
+    process' writes can go unseen. A ttl of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        # Bumped on every invalidation so a load that raced with a write is not kept
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _get(self, session: Session) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.ttl:
+            cache_hit("room_catalog")
+            return snapshot
+
+        cache_miss("room_catalog")
+        generation = self._generation
+        rooms = session.exec(select(Room).order_by(Room.id)).all()
+        snapshot = _Snapshot(rooms, time.monotonic())
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def get(self, session: Session, room_id: int) -> Optional[RoomRead]:
+        return self._get(session).by_id.get(room_id)
+
+    def find(
+        self,
+        session: Session,
+        sede: Optional[SedeEnum] = None,
+        recursos_todos: int = 0,
+        recursos_alguno: int = 0,
+        capacidad_min: Optional[int] = None,
+    ) -> List[RoomRead]:
+        """Rooms matching every given filter (resources as RECURSO_BITS masks), ordered by id"""
+        snapshot = self._get(session)
+        rooms = snapshot.by_sede.get(sede, []) if sede else snapshot.rooms
+        if recursos_todos or recursos_alguno:
+            ids = snapshot.with_resources(recursos_todos, recursos_alguno)
+            rooms = [r for r in rooms if r.id in ids]
+        if capacidad_min:
+            rooms = [r for r in rooms if r.capacidad >= capacidad_min]
+        return rooms
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+room_catalog = RoomCatalog(ttl=float(os.getenv("ROOM_CACHE_TTL", "300")))
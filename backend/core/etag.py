@@ -0,0 +1,105 @@
+"""
+Weak ETags for read endpoints, derived from per-table version counters.
+
+Every committed transaction bumps the counter of each table it wrote, whether
+through ORM flushes or insert/update/delete statements. An ETag hashes the
+counters of the tables a response is built from, this process' boot id and
+the request URL, so it can be computed, and If-None-Match answered, without
+touching the database.
+
+The counters are process-local, like the room catalog: with several workers
+a write is seen at once by the worker that made it and by the others within
+ETAG_TTL seconds, when every ETag rolls over. ETAG_TTL=0 disables 304s.
+
+The tags name a version of the data, not the exact bytes sent (the identity,
+gzip and brotli bodies all share one), so they are weak: W/"...".
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.core.metrics import cache_hit, cache_miss
+
+BOOT_ID = uuid.uuid4().hex
+
+_CHANGED = "etag_changed_tables"
+
+class TableVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+table_versions = TableVersions()
+
+ETAG_TTL = float(os.getenv("ETAG_TTL", "60"))
+
+def compute_etag(request: Request, *tables: str) -> str:
+    epoch = int(time.time() // ETAG_TTL) if ETAG_TTL > 0 else 0
+    versions = ",".join(f"{table}:{table_versions.get(table)}" for table in tables)
+    digest = hashlib.sha256(f"{BOOT_ID}|{epoch}|{versions}|{request.url.path}?{request.url.query}".encode())
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: W/"x" and "x" are the same tag
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+def conditional_get(*tables: str) -> Callable:
+    """
+    Dependency for a GET built from `tables`: sets the ETag header and answers
+    304 when If-None-Match already has it. Declare it after the auth
+    dependency so unauthenticated requests never learn the ETag.
+    """
+    def dependency(request: Request, response: Response) -> None:
+        etag = compute_etag(request, *tables)
+        if_none_match = request.headers.get("if-none-match")
+        if ETAG_TTL > 0 and if_none_match is not None:
+            if _matches(if_none_match, etag):
+                cache_hit("etag")
+                raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            cache_miss("etag")
+        response.headers["ETag"] = etag
+
+    return dependency
+
+# Table tracking, for every session (the async ones run these on their sync session)
+
+def _remember(session: Session, *tables: str) -> None:
+    session.info.setdefault(_CHANGED, set()).update(tables)
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            _remember(session, table)
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _remember(orm_execute_state.session, orm_execute_state.statement.table.name)
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    changed = session.info.pop(_CHANGED, None)
+    if changed:
+        table_versions.bump(*changed)
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_CHANGED, None)
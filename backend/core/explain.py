@@ -0,0 +1,128 @@
+"""
+Query plan check for the hot reservation queries.
+
+    python -m backend.core.explain
+
+Runs the controller methods that read the reservation table against the
+configured database, captures the SQL they actually emit and EXPLAINs it
+(EXPLAIN on MySQL, EXPLAIN QUERY PLAN on SQLite). Exits with status 1 when a
+query has to read the reservation table with a full scan because no index
+can serve it.
+"""
+import logging
+import sys
+from contextlib import contextmanager
+from datetime import date, time
+from typing import Callable, List, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+TABLE = "reservation"
+
+@contextmanager
+def _capture_selects(engine, statements: List[Tuple[str, object]]):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and TABLE in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def _hot_queries(session: Session) -> List[Tuple[str, Callable[[], object]]]:
+    # Imports intentionally inside the function to avoid circular imports.
+    from backend.controllers.reservations.ReservationsController import ReservationsController
+    from backend.controllers.rooms.RoomsController import RoomsController
+    from backend.core.occupancy import OccupancyIndex
+    from backend.models.reservations.ReservationsModel import Reservation
+
+    sample = session.exec(select(Reservation).limit(1)).first()
+    fecha = sample.fecha if sample else date.today()
+    hora = sample.hora_inicio if sample else time(9)
+
+    controller = ReservationsController(session)
+    cursor = ReservationsController.keyset.encode([fecha, time(0), 0])
+
+    queries = []
+    if sample is not None:
+        queries += [
+            ("reservations by user", lambda: controller.get_reservations_by_user(sample.usuario_id, limit=100)),
+            ("reservations by room", lambda: controller.get_reservations_by_room(sample.sala_id, limit=100)),
+        ]
+    else:
+        # Both look the user or room up first and answer 404 for an unknown id
+        logger.warning("	SKIP reservations by user/room: no reservations to take a user and room from")
+
+    return queries + [
+        ("reservations by date", lambda: controller.get_reservations_by_date(fecha, limit=100)),
+        ("reservations next page", lambda: controller.list_reservations_with_details(limit=100, cursor=cursor)),
+        ("occupancy day load", lambda: OccupancyIndex().ensure_loaded(session, fecha)),
+        ("available rooms", lambda: RoomsController(session).list_available_rooms(fecha, hora)),
+    ]
+
+def _mysql_full_scans(connection, statement: str, parameters) -> List[str]:
+    rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+    problems = []
+    for row in rows:
+        if row["table"] != TABLE or row["type"] != "ALL":
+            continue
+        if row["possible_keys"]:
+            logger.warning(f"\tOptimizer chose a full scan of '{TABLE}' (small table?) over {row['possible_keys']}")
+        else:
+            problems.append(f"full scan of '{TABLE}' with no usable index")
+    return problems
+
+def _sqlite_full_scans(connection, statement: str, parameters) -> List[str]:
+    # Plan rows read 'SCAN reservation' for a full table scan, and
+    # 'SEARCH reservation USING INDEX ...' or 'SCAN reservation USING INDEX ...' otherwise
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return [
+        f"full scan of '{TABLE}' with no usable index"
+        for row in rows
+        if row[-1].split() == ["SCAN", TABLE]
+    ]
+
+_FULL_SCAN_CHECKS = {
+    "mysql": _mysql_full_scans,
+    "sqlite": _sqlite_full_scans,
+}
+
+def check_query_plans() -> bool:
+    """EXPLAIN every hot query; returns False if any of them needs a full scan"""
+    engine = get_engine()
+    full_scans = _FULL_SCAN_CHECKS.get(engine.dialect.name)
+    if full_scans is None:
+        raise RuntimeError(f"EXPLAIN check not supported for dialect '{engine.dialect.name}'")
+
+    ok = True
+    with Session(engine) as session:
+        for name, run in _hot_queries(session):
+            statements: List[Tuple[str, object]] = []
+            with _capture_selects(engine, statements):
+                run()
+
+            problems = []
+            for statement, parameters in statements:
+                problems += full_scans(session.connection(), statement, parameters)
+
+            if problems:
+                ok = False
+                logger.error(f"\tFAIL {name}: {'; '.join(problems)}")
+            else:
+                logger.info(f"\tOK   {name} ({len(statements)} queries)")
+        session.rollback()
+
+    return ok
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    sys.exit(0 if check_query_plans() else 1)
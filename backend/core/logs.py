@@ -0,0 +1,117 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """'app.auth=WARNING,backend.core.db=DEBUG' -> {'app.auth': 'WARNING', ...}"""
+    mapping = {}
+    for item in value.split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: key=value text, or a JSON object with LOG_FORMAT=json"""
+
+    def __init__(self, as_json: bool = False):
+        super().__init__(datefmt="%Y-%m-%dT%H:%M:%S")
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields.update((k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS)
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+
+        if self.as_json:
+            return json.dumps(fields, default=str, ensure_ascii=False)
+        extras = " ".join(f"{k}={v}" for k, v in fields.items() if k not in ("ts", "level", "logger", "msg", "exc"))
+        line = f"{fields['ts']} {fields['level']} {fields['logger']} - {fields['msg']}"
+        if extras:
+            line += f" | {extras}"
+        if "exc" in fields:
+            line += "\n" + fields["exc"]
+        return line
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records below WARNING for the configured
+    logger prefixes, e.g. {'app.auth': 0.01} keeps 1% of auth INFO/DEBUG lines.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first so the most specific rate wins
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                return rate >= 1 or random.random() < rate
+        return True
+
+class _InProcessQueueHandler(QueueHandler):
+    # The listener runs in this process, so the record is queued as is and
+    # message formatting happens on the listener thread, not the caller's
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+def configure_logging() -> None:
+    """
+    Route every log record through a queue drained by a background thread so
+    request handlers never block on stdout. Settings come from the environment:
+
+    - LOG_LEVEL: root level (INFO)
+    - LOG_LEVELS: per-logger levels, 'app.auth=WARNING,backend.core.db=DEBUG'
+    - LOG_SAMPLING: sample rate of sub-WARNING records per logger, 'app.auth=0.05'
+    - LOG_FORMAT: 'text' or 'json'
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(StructuredFormatter(as_json=os.getenv("LOG_FORMAT", "text").lower() == "json"))
+
+    handler = _InProcessQueueHandler(queue.SimpleQueue())
+    sampling = {name: float(rate) for name, rate in _parse_mapping(os.getenv("LOG_SAMPLING", "")).items()}
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in _parse_mapping(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush the queue and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,261 @@
+"""
+Prometheus metrics: request count, latency and errors by route template and
+method, requests in flight, connection pool gauges and cache hit ratios,
+rendered in the text exposition format by render().
+
+Counters and histograms keep one shard per thread. A request only touches its
+own thread's shard, so recording takes no lock; the shards are summed when
+/metrics is scraped. Worker threads come and go, so on each scrape the shards
+of threads that have exited are folded into a retained total and dropped.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds (seconds) of the request latency histogram; the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Shard of each thread that recorded, and what exited threads left behind
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        registry.append(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _merge(self, into: dict, shard: dict) -> dict:
+        raise NotImplementedError
+
+    def _totals(self) -> dict:
+        """Sum of every shard, folding those of exited threads into the retained total"""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            totals = self._merge({}, self._retired)
+        # dict() copies under the GIL, so a concurrent write can't break it
+        for _, shard in live:
+            self._merge(totals, dict(shard))
+        return totals
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, into: dict, shard: dict) -> dict:
+        for labels, value in shard.items():
+            into[labels] = into.get(labels, 0) + value
+        return into
+
+    def values(self) -> Dict[Labels, float]:
+        return self._totals()
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Tuple, float]]:
+        for labels, value in sorted(self.values().items()):
+            yield self.name, labels, (), value
+
+class Gauge(Counter):
+    """Counter that can go down, for values tracked as they change (requests in flight)"""
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        # Per-bucket counts (last one is +Inf) followed by the sum
+        counts = shard.get(labels)
+        if counts is None:
+            counts = shard[labels] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def _merge(self, into: dict, shard: dict) -> dict:
+        for labels, counts in shard.items():
+            counts = list(counts)
+            total = into.setdefault(labels, [0] * len(counts))
+            for i, value in enumerate(counts):
+                total[i] += value
+        return into
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Tuple, float]]:
+        for labels, counts in sorted(self._totals().items()):
+            yield from histogram_samples(self.name, labels, self.buckets, counts[:-1], counts[-1])
+
+def histogram_samples(name: str, labels: Labels, bounds: Sequence[float], counts: Sequence[float], total: float):
+    """_bucket/_sum/_count samples of per-bucket (not cumulative) counts, the last one being +Inf"""
+    cumulative = 0
+    for bound, count in zip(tuple(bounds) + (float("inf"),), counts):
+        cumulative += count
+        yield f"{name}_bucket", labels, ("le", "+Inf" if bound == float("inf") else repr(float(bound))), cumulative
+    yield f"{name}_sum", labels, (), total
+    yield f"{name}_count", labels, (), cumulative
+
+registry: List[_Metric] = []
+
+http_requests = Counter(
+    "geresaco_http_requests_total", "HTTP requests by route template, method and status", ("method", "route", "status")
+)
+http_errors = Counter(
+    "geresaco_http_request_errors_total", "Requests that raised or answered 5xx", ("method", "route")
+)
+http_latency = Histogram(
+    "geresaco_http_request_duration_seconds", "Request latency, including the streamed body", ("method", "route")
+)
+http_in_flight = Gauge("geresaco_http_requests_in_flight", "Requests being served")
+cache_requests = Counter("geresaco_cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+
+def cache_hit(cache: str) -> None:
+    cache_requests.inc((cache, "hit"))
+
+def cache_miss(cache: str) -> None:
+    cache_requests.inc((cache, "miss"))
+
+# Route label of requests no route matched, so unknown paths can't grow the label set
+UNMATCHED_ROUTE = "<unmatched>"
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        failed = False
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            # The router leaves the matched route in the scope
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            http_requests.inc(labels + (str(status_code),))
+            http_latency.observe(elapsed, labels)
+            if failed or status_code >= 500:
+                http_errors.inc(labels)
+
+Sample = Tuple[str, str, str, str, Labels, Tuple, float]
+
+def _pool_samples() -> Iterable[Sample]:
+    from backend.core import db
+    from backend.core.pool import WAIT_BUCKETS_MS, instrumented_pools
+
+    for pool in instrumented_pools(db.engine, db.async_engine):
+        stats, labels = pool.stats, (pool.stats.name,)
+        for family, kind, help, value in (
+            ("geresaco_db_pool_size", "gauge", "Configured pool size", pool.size()),
+            ("geresaco_db_pool_checked_out", "gauge", "Connections in use", pool.checkedout()),
+            ("geresaco_db_pool_idle", "gauge", "Idle connections in the pool", pool.checkedin()),
+            ("geresaco_db_pool_overflow", "gauge", "Connections over pool_size", max(pool.overflow(), 0)),
+            ("geresaco_db_pool_timeouts_total", "counter", "Checkouts that timed out", stats.timeouts),
+        ):
+            yield family, kind, help, family, labels, (), value
+
+        family = "geresaco_db_pool_checkout_wait_seconds"
+        buckets, total_ms = stats.histogram()
+        bounds = [ms / 1000 for ms in WAIT_BUCKETS_MS]
+        for name, sample_labels, extra, value in histogram_samples(family, labels, bounds, buckets, total_ms / 1000):
+            yield family, "histogram", "Time waited for a connection", name, sample_labels, extra, value
+
+def _cache_ratio_samples() -> Iterable[Sample]:
+    lookups: Dict[str, Dict[str, float]] = {}
+    for (cache, result), value in cache_requests.values().items():
+        lookups.setdefault(cache, {})[result] = value
+    family = "geresaco_cache_hit_ratio"
+    for cache, results in sorted(lookups.items()):
+        total = results.get("hit", 0) + results.get("miss", 0)
+        ratio = results.get("hit", 0) / total if total else 0.0
+        yield family, "gauge", "Cache hits over lookups since start", family, (cache,), (), ratio
+
+# Gathered at scrape time: label names and a function yielding
+# (family, type, help, sample name, labels, extra label, value)
+COLLECTORS: List[Tuple[Sequence[str], Callable[[], Iterable[Sample]]]] = [
+    (("pool",), _pool_samples),
+    (("cache",), _cache_ratio_samples),
+]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _line(name: str, labelnames: Sequence[str], labels: Labels, extra: Tuple, value: float) -> str:
+    pairs = list(zip(labelnames, labels))
+    if extra:
+        pairs.append(extra)
+    rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in pairs)
+    return f"{name}{{{rendered}}} {_format(value)}" if rendered else f"{name} {_format(value)}"
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, extra, value in metric.samples():
+            lines.append(_line(name, metric.labelnames, labels, extra, value))
+
+    # Samples of a family must be contiguous, whichever pool or cache they come from
+    families: Dict[str, List[str]] = {}
+    for labelnames, collect in COLLECTORS:
+        for family, kind, help, name, labels, extra, value in collect():
+            if family not in families:
+                families[family] = [f"# HELP {family} {help}", f"# TYPE {family} {kind}"]
+            families[family].append(_line(name, labelnames, labels, extra, value))
+    for family_lines in families.values():
+        lines.extend(family_lines)
+    return "\n".join(lines) + "\n"
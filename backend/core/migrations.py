@@ -0,0 +1,122 @@
+"""
+Data migrations of older databases.
+
+    python -m backend.core.migrations [--drop-legacy-room-resources]
+
+The startup bootstrap only runs the lossless part: the legacy free-text
+room.recursos column is copied, as it was, into room_recursos_legacy and
+converted into room.recursos_mask, but the column itself is kept. Dropping it
+is a separate, explicit step once the copy has been checked.
+"""
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, insert, select, text
+
+from backend.core.db import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Kept out of SQLModel.metadata: it only exists in databases that had the legacy column
+_legacy_metadata = MetaData()
+room_recursos_legacy = Table(
+    "room_recursos_legacy",
+    _legacy_metadata,
+    Column("room_id", Integer, primary_key=True, autoincrement=False),
+    # The legacy value exactly as it was stored
+    Column("recursos", String(255), nullable=False),
+    # Entries that map to no resource bit, comma-separated
+    Column("desconocidos", String(255), nullable=False),
+    Column("migrated_at", DateTime, nullable=False),
+)
+
+def _legacy_column(engine):
+    return next((c for c in inspect(engine).get_columns("room") if c["name"] == "recursos"), None)
+
+def _relax_legacy_column(engine, column) -> None:
+    """Rooms created from now on don't set the legacy column, so it must accept NULL"""
+    if engine.dialect.name == "mysql":
+        column_type = column["type"].compile(dialect=engine.dialect)
+        logger.info("\tMaking room.recursos nullable...")
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE room MODIFY recursos {column_type} NULL"))
+        return
+    logger.warning(
+        "\troom.recursos is NOT NULL and can't be relaxed on this backend: new rooms can't be created "
+        "until it is dropped with `python -m backend.core.migrations --drop-legacy-room-resources`"
+    )
+
+def migrate_room_resources(relax_legacy_column: bool = True) -> None:
+    """
+    Convert the legacy comma-separated room.recursos column into
+    room.recursos_mask, copying every original value into room_recursos_legacy
+    first. Idempotent: rooms already copied are left alone.
+    """
+    from backend.models.rooms.RoomsModel import legacy_recursos_to_mask
+
+    engine = get_engine()
+    legacy = _legacy_column(engine)
+    if legacy is None:
+        return
+
+    _legacy_metadata.create_all(engine)
+    with engine.begin() as connection:
+        copied = set(connection.execute(select(room_recursos_legacy.c.room_id)).scalars())
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        snapshots, masks = [], []
+        for room_id, recursos in connection.execute(text("SELECT id, recursos FROM room")).all():
+            # NULL: a room created after the migration, with no legacy value
+            if room_id in copied or recursos is None:
+                continue
+            mask, unknown = legacy_recursos_to_mask(recursos)
+            if unknown:
+                logger.warning(f"\tRoom {room_id}: resources {unknown} have no bit; kept in room_recursos_legacy")
+            snapshots.append({
+                "room_id": room_id, "recursos": recursos, "desconocidos": ",".join(unknown), "migrated_at": now,
+            })
+            masks.append({"id": room_id, "mask": mask})
+        if snapshots:
+            logger.info(f"\tMigrating room.recursos of {len(snapshots)} rooms to room.recursos_mask...")
+            connection.execute(insert(room_recursos_legacy), snapshots)
+            connection.execute(text("UPDATE room SET recursos_mask = :mask WHERE id = :id"), masks)
+
+    if relax_legacy_column and not legacy["nullable"]:
+        _relax_legacy_column(engine, legacy)
+
+def drop_legacy_room_resources() -> None:
+    """Drop room.recursos, once every legacy value has been copied to room_recursos_legacy"""
+    migrate_room_resources(relax_legacy_column=False)
+    engine = get_engine()
+    if _legacy_column(engine) is None:
+        logger.info("\troom.recursos does not exist; nothing to drop")
+        return
+
+    with engine.begin() as connection:
+        uncopied = connection.execute(text(
+            "SELECT COUNT(*) FROM room WHERE recursos IS NOT NULL "
+            "AND id NOT IN (SELECT room_id FROM room_recursos_legacy)"
+        )).scalar_one()
+        if uncopied:
+            raise RuntimeError(f"{uncopied} rooms have legacy resources not copied to room_recursos_legacy")
+        logger.info("\tDropping room.recursos (values kept in room_recursos_legacy)...")
+        connection.execute(text("ALTER TABLE room DROP COLUMN recursos"))
+
+if __name__ == "__main__":
+    from backend.core.logs import configure_logging
+
+    parser = argparse.ArgumentParser(description="Migrate data of older databases")
+    parser.add_argument(
+        "--drop-legacy-room-resources",
+        action="store_true",
+        help="Drop the legacy room.recursos column after copying it to room_recursos_legacy",
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging()
+    if args.drop_legacy_room_resources:
+        drop_legacy_room_resources()
+    else:
+        migrate_room_resources()
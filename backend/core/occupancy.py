@@ -0,0 +1,186 @@
+import threading
+from datetime import date, time
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from backend.core.metrics import cache_hit, cache_miss
+from backend.models.reservations.ReservationsModel import Reservation, EstadoReservaEnum
+
+# One bit per minute of the day: exact for any HH:MM reservation boundary
+SLOTS_PER_DAY = 24 * 60
+
+SlotKey = Tuple[int, date]
+Entry = Tuple[SlotKey, int]
+
+def slot_mask(hora_inicio: time, hora_fin: time) -> int:
+    """Bitmask of the minute slots covered by [hora_inicio, hora_fin)"""
+    start = hora_inicio.hour * 60 + hora_inicio.minute
+    end = hora_fin.hour * 60 + hora_fin.minute
+    if hora_fin.second or hora_fin.microsecond:
+        end += 1
+    if end <= start:
+        return 0
+    return ((1 << (end - start)) - 1) << start
+
+class OccupancyIndex:
+    """
+    Process-local index of booked slots keyed by (sala_id, fecha).
+
+    Each day is loaded lazily from the reservation table the first time it is
+    touched; after that conflict checks are bitwise operations with no query.
+    Every mutation goes through a loaded day, so a concurrent load can never
+    overwrite a newer in-memory state.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded: Set[date] = set()
+        self._entries: Dict[int, Entry] = {}
+        self._by_key: Dict[SlotKey, Dict[int, int]] = {}
+        # fecha -> {sala_id: union of booked slots}, so a whole day can be read at once
+        self._masks: Dict[date, Dict[int, int]] = {}
+
+    def ensure_loaded(self, session: Session, fecha: date) -> None:
+        """Load every active reservation of a day into the index (once)"""
+        self.ensure_loaded_many(session, [fecha])
+
+    def ensure_loaded_many(self, session: Session, fechas: Iterable[date]) -> None:
+        """Load several days with a single query, skipping the ones already loaded"""
+        missing = {fecha for fecha in fechas if fecha not in self._loaded}
+        if not missing:
+            cache_hit("occupancy")
+            return
+        cache_miss("occupancy")
+
+        with session.no_autoflush:
+            rows = session.exec(
+                select(Reservation.id, Reservation.sala_id, Reservation.fecha, Reservation.hora_inicio, Reservation.hora_fin)
+                .where(Reservation.fecha.in_(missing))
+                .where(Reservation.estado != EstadoReservaEnum.cancelada)
+            ).all()
+
+        with self._lock:
+            missing -= self._loaded
+            for reservation_id, sala_id, fecha, hora_inicio, hora_fin in rows:
+                if fecha in missing and reservation_id not in self._entries:
+                    self._put(reservation_id, (sala_id, fecha), slot_mask(hora_inicio, hora_fin))
+            self._loaded |= missing
+
+    def is_free(
+        self,
+        session: Session,
+        sala_id: int,
+        fecha: date,
+        hora_inicio: time,
+        hora_fin: time,
+        exclude_id: Optional[int] = None,
+    ) -> bool:
+        self.ensure_loaded(session, fecha)
+        with self._lock:
+            return not self._busy_mask((sala_id, fecha), exclude_id) & slot_mask(hora_inicio, hora_fin)
+
+    def busy_rooms(self, session: Session, fecha: date, hora_inicio: time, hora_fin: time) -> Set[int]:
+        """Ids of the rooms with at least one booked slot inside [hora_inicio, hora_fin)"""
+        self.ensure_loaded(session, fecha)
+        mask = slot_mask(hora_inicio, hora_fin)
+        with self._lock:
+            return {
+                sala_id
+                for sala_id, room_mask in self._masks.get(fecha, {}).items()
+                if room_mask & mask
+            }
+
+    def claim(
+        self,
+        session: Session,
+        reservation_id: Hashable,
+        sala_id: int,
+        fecha: date,
+        hora_inicio: time,
+        hora_fin: time,
+    ) -> bool:
+        """
+        Atomically check the slots and record them for reservation_id.
+        Returns False, leaving the index untouched, if another reservation holds them.
+        """
+        self.ensure_loaded(session, fecha)
+        key = (sala_id, fecha)
+        mask = slot_mask(hora_inicio, hora_fin)
+        with self._lock:
+            if self._busy_mask(key, reservation_id) & mask:
+                return False
+            self._drop(reservation_id)
+            self._put(reservation_id, key, mask)
+            return True
+
+    def snapshot(self, session: Session, reservation_id: int, fecha: date) -> Optional[Entry]:
+        """Current entry of a reservation, to be handed back to restore() on rollback"""
+        self.ensure_loaded(session, fecha)
+        with self._lock:
+            return self._entries.get(reservation_id)
+
+    def release(self, reservation_id: Hashable) -> None:
+        with self._lock:
+            self._drop(reservation_id)
+
+    def restore(self, reservation_id: int, entry: Optional[Entry]) -> None:
+        with self._lock:
+            self._drop(reservation_id)
+            if entry is not None:
+                self._put(reservation_id, *entry)
+
+    def rekey(self, old_id: Hashable, new_id: int) -> None:
+        """Move an entry claimed under a provisional key to the reservation's real id"""
+        with self._lock:
+            entry = self._entries.get(old_id)
+            self._drop(old_id)
+            if entry is not None:
+                self._put(new_id, *entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._loaded.clear()
+            self._entries.clear()
+            self._by_key.clear()
+            self._masks.clear()
+
+    # The helpers below must be called with self._lock held
+
+    def _busy_mask(self, key: SlotKey, exclude_id: Optional[int]) -> int:
+        owners = self._by_key.get(key)
+        if not owners:
+            return 0
+        if exclude_id is None or exclude_id not in owners:
+            return self._masks[key[1]][key[0]]
+        mask = 0
+        for owner, owner_mask in owners.items():
+            if owner != exclude_id:
+                mask |= owner_mask
+        return mask
+
+    def _put(self, reservation_id: int, key: SlotKey, mask: int) -> None:
+        self._entries[reservation_id] = (key, mask)
+        self._by_key.setdefault(key, {})[reservation_id] = mask
+        day = self._masks.setdefault(key[1], {})
+        day[key[0]] = day.get(key[0], 0) | mask
+
+    def _drop(self, reservation_id: int) -> None:
+        entry = self._entries.pop(reservation_id, None)
+        if entry is None:
+            return
+        key = entry[0]
+        owners = self._by_key[key]
+        del owners[reservation_id]
+        sala_id, fecha = key
+        if not owners:
+            del self._by_key[key]
+            del self._masks[fecha][sala_id]
+            return
+        # Recompute instead of clearing bits: legacy rows may overlap
+        mask = 0
+        for owner_mask in owners.values():
+            mask |= owner_mask
+        self._masks[fecha][sala_id] = mask
+
+occupancy_index = OccupancyIndex()
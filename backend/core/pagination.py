@@ -0,0 +1,87 @@
+import base64
+import binascii
+import bisect
+import json
+from datetime import date, time
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Keyset:
+    """
+    Ordering of a listing used for cursor (seek) pagination.
+
+    The cursor is an opaque URL-safe token holding the ordering values of the
+    last row of a page; the next page starts strictly after it, so the database
+    seeks on the index instead of counting and discarding `skip` rows.
+    """
+
+    def __init__(self, *columns):
+        self.columns = columns
+        self.fields = [c.key for c in columns]
+        self._types = [c.type.python_type for c in columns]
+
+    def apply(self, query, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Order the query and page it by cursor, falling back to skip for older clients"""
+        query = query.order_by(*self.columns)
+        if cursor:
+            query = query.where(self._after(self.decode(cursor)))
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    def page(self, items: Sequence[Any], skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Any]:
+        """apply() for an in-memory sequence already sorted by the keyset columns"""
+        if cursor:
+            after = tuple(self.decode(cursor))
+            start = bisect.bisect_right(items, after, key=lambda item: tuple(getattr(item, f) for f in self.fields))
+        else:
+            start = skip
+        return list(items[start:start + limit])
+
+    def encode(self, values: Sequence[Any]) -> str:
+        raw = json.dumps(
+            [v.isoformat() if isinstance(v, (date, time)) else v for v in values],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values, list) or len(values) != len(self._types):
+                raise ValueError(cursor)
+            return [
+                t.fromisoformat(v) if t in (date, time) else t(v)
+                for t, v in zip(self._types, values)
+            ]
+        except (ValueError, TypeError, binascii.Error):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido",
+            )
+
+    def next_cursor(self, items: Sequence[Any], limit: int) -> Optional[str]:
+        """Cursor of the page after `items`, or None when this was the last page"""
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        if isinstance(last, dict):
+            return self.encode([last[f] for f in self.fields])
+        return self.encode([getattr(last, f) for f in self.fields])
+
+    def set_next_cursor(self, response: Response, items: Sequence[Any], limit: int) -> None:
+        cursor = self.next_cursor(items, limit)
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+
+    def _after(self, values: Sequence[Any]):
+        # (a, b, c) > (x, y, z) written as OR-ed prefixes so MySQL can range-scan the index
+        clauses = []
+        for i, column in enumerate(self.columns):
+            equal_prefix = [c == v for c, v in zip(self.columns[:i], values[:i])]
+            clauses.append(and_(*equal_prefix, column > values[i]))
+        return or_(*clauses)
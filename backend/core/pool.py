@@ -0,0 +1,141 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the checkout wait histogram; the last bucket is +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+class PoolStats:
+    """Checkout wait histogram and timeout count of one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.timeouts = 0
+        self._last_log = time.monotonic()
+
+    def observe_wait(self, seconds: float) -> None:
+        ms = seconds * 1000
+        index = len(WAIT_BUCKETS_MS)
+        for i, bound in enumerate(WAIT_BUCKETS_MS):
+            if ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total_ms += ms
+
+    def histogram(self) -> Tuple[List[int], float]:
+        """Per-bucket checkout counts and total wait in ms, read together"""
+        with self._lock:
+            return list(self.buckets), self.total_ms
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def log_due(self, interval: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if interval <= 0 or now - self._last_log < interval:
+                return False
+            self._last_log = now
+            return True
+
+def bucket_quantile(buckets: List[int], q: float) -> Optional[float]:
+    """Upper bound (ms) of the bucket of a histogram snapshot holding the q-quantile"""
+    count = sum(buckets)
+    if not count:
+        return None
+    rank = q * count
+    seen = 0
+    for bound, n in zip(WAIT_BUCKETS_MS + (float("inf"),), buckets):
+        seen += n
+        if seen >= rank:
+            return bound
+    return float("inf")
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and periodically logs the pool status"""
+
+    stats: PoolStats = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.observe_timeout()
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - start)
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        if self.stats.log_due(float(os.environ.get("DB_POOL_LOG_INTERVAL", "60"))):
+            log_pool_status(self)
+
+    def recreate(self):
+        # engine.dispose() swaps the pool; keep accumulating into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def pool_status(pool) -> Dict:
+    stats = pool.stats
+    # One locked snapshot, so the count, average and quantiles agree with each other
+    buckets, total_ms = stats.histogram()
+    count = sum(buckets)
+    return {
+        "name": stats.name,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "timeouts": stats.timeouts,
+        "wait": {
+            "count": count,
+            "avg_ms": round(total_ms / count, 3) if count else None,
+            "p50_ms": bucket_quantile(buckets, 0.50),
+            "p95_ms": bucket_quantile(buckets, 0.95),
+            "p99_ms": bucket_quantile(buckets, 0.99),
+            "buckets_ms": dict(zip([str(b) for b in WAIT_BUCKETS_MS] + ["+Inf"], buckets)),
+        },
+    }
+
+def log_pool_status(pool) -> None:
+    status = pool_status(pool)
+    wait = status["wait"]
+    logger.info(
+        f"Pool {status['name']}: size={status['size']} checked_out={status['checked_out']} "
+        f"idle={status['idle']} overflow={status['overflow']} timeouts={status['timeouts']} "
+        f"wait_p50={wait['p50_ms']}ms wait_p95={wait['p95_ms']}ms wait_p99={wait['p99_ms']}ms"
+    )
+
+def instrumented_pools(*engines) -> List:
+    """Pools of the given engines (sync or async) that carry statistics"""
+    pools = []
+    for engine in engines:
+        if engine is None:
+            continue
+        pool = getattr(engine, "sync_engine", engine).pool
+        if getattr(pool, "stats", None) is not None:
+            pools.append(pool)
+    return pools
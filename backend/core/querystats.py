@@ -0,0 +1,74 @@
+"""
+Per-request database statistics and query budgets.
+
+QueryStatsMiddleware tracks the statements every request runs (see
+db.track_queries). With DEBUG=true it reports them in the X-DB-Queries and
+X-DB-Time-Ms response headers, which is what assert_query_budget reads to
+check an endpoint against its declared budget.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.db import QueryStats, track_queries
+
+DEBUG = os.getenv("DEBUG", "false").strip().lower() in ("1", "true", "yes", "on")
+
+QUERIES_HEADER = "X-DB-Queries"
+TIME_HEADER = "X-DB-Time-Ms"
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp, expose_headers: bool = DEBUG):
+        self.app = app
+        self.expose_headers = expose_headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            scope.setdefault("state", {})["query_stats"] = stats
+            if not self.expose_headers:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_with_stats(message: Message) -> None:
+                # Streamed bodies may query after this point; the headers count until the response starts
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERIES_HEADER] = str(stats.count)
+                    headers[TIME_HEADER] = f"{stats.seconds * 1000:.2f}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """Fail when the code inside the block runs more than `max_queries` statements"""
+    with track_queries(record_statements=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {statement}" for statement in stats.statements)
+        raise QueryBudgetExceeded(f"{label} ran {stats.count} queries, budget is {max_queries}:\n{statements}")
+
+def assert_query_budget(response, max_queries: int, label: Optional[str] = None) -> int:
+    """
+    Fail when a response (TestClient/httpx) reports more than `max_queries`
+    statements in X-DB-Queries. The application must run with DEBUG=true.
+    Returns the number of queries.
+    """
+    label = label or f"{response.request.method} {response.request.url.path}"
+    reported = response.headers.get(QUERIES_HEADER)
+    if reported is None:
+        raise QueryBudgetExceeded(f"{label}: no {QUERIES_HEADER} header; is DEBUG=true?")
+    count = int(reported)
+    if count > max_queries:
+        raise QueryBudgetExceeded(f"{label} ran {count} queries, budget is {max_queries}")
+    return count
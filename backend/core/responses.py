@@ -0,0 +1,31 @@
+import os
+
+import orjson
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+
+from backend.core.timing import span
+
+FAST_JSON = os.getenv("FAST_JSON", "false").strip().lower() in ("1", "true", "yes", "on")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, which handles dates, times and enums natively"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def fast_json(content, response: Response):
+    """
+    Send `content` (plain dicts and lists) as a FastJSONResponse, skipping the
+    response_model validation and serialization; the headers already set on
+    `response` are kept. Opt-in: unless FAST_JSON=true the content is returned
+    as is and goes through the usual response_model path.
+    """
+    if not FAST_JSON:
+        return content
+    with span("render"):
+        return FastJSONResponse(
+            content,
+            status_code=response.status_code or status.HTTP_200_OK,
+            headers=dict(response.headers),
+        )
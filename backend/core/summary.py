@@ -0,0 +1,188 @@
+"""
+Maintenance of the room_day_summary table.
+
+    python -m backend.core.summary [--desde YYYY-MM-DD] [--hasta YYYY-MM-DD]
+
+Every write path of the reservation table calls refresh_room_days() with the
+(sala_id, fecha) pairs it touched, before committing, so the summary changes
+in the same transaction as the reservations. Run as a module it rebuilds the
+table (or a date range of it) from scratch, e.g. after rows were edited by
+hand.
+
+Lock order. A write path must call lock_room_days() for every room-day it
+will touch BEFORE it inserts or updates any of their reservation rows:
+
+    lock_room_days()      summary rows, exclusively, in (sala_id, fecha) order
+    INSERT/UPDATE         reservation rows
+    refresh_room_days()   plain read of the reservations, then the summary
+
+Two writers of the same room-day then queue on its summary row and neither
+ever holds a reservation row the other needs. Taking the summary lock after
+writing a reservation deadlocks on MySQL: each writer holds its uncommitted
+reservation row while waiting for the other's. The aggregate is a plain read,
+which on MySQL sees what earlier lock holders committed because the engine
+runs at READ COMMITTED (see db.get_engine_options).
+"""
+import argparse
+import logging
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, event, func, insert, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlmodel import Session, select
+
+from backend.core.db import get_engine
+from backend.core.occupancy import SlotKey, slot_mask
+from backend.models.reservations.ReservationsModel import Reservation, EstadoReservaEnum
+from backend.models.summary.SummaryModel import RoomDaySummary, MASK_BYTES
+
+logger = logging.getLogger(__name__)
+
+REBUILD_CHUNK_ROWS = 5000
+
+# Summary column holding the count of each estado
+COUNT_FIELDS = {
+    EstadoReservaEnum.pendiente: "pendientes",
+    EstadoReservaEnum.confirmada: "confirmadas",
+    EstadoReservaEnum.cancelada: "canceladas",
+}
+
+_columns = (Reservation.sala_id, Reservation.fecha, Reservation.hora_inicio, Reservation.hora_fin, Reservation.estado)
+
+def _empty_day() -> dict:
+    return {"mask": 0, **{field: 0 for field in COUNT_FIELDS.values()}}
+
+def _summarize(rows) -> Dict[SlotKey, dict]:
+    """Fold reservation rows into {(sala_id, fecha): {mask, pendientes, confirmadas, canceladas}}"""
+    days: Dict[SlotKey, dict] = {}
+    for sala_id, fecha, hora_inicio, hora_fin, estado in rows:
+        day = days.get((sala_id, fecha))
+        if day is None:
+            day = days[(sala_id, fecha)] = _empty_day()
+        day[COUNT_FIELDS[EstadoReservaEnum(estado)]] += 1
+        if estado != EstadoReservaEnum.cancelada:
+            day["mask"] |= slot_mask(hora_inicio, hora_fin)
+    return days
+
+def _row(key: SlotKey, day: dict) -> dict:
+    return {"sala_id": key[0], "fecha": key[1], **day, "mask": day["mask"].to_bytes(MASK_BYTES, "little")}
+
+def _lock_rows(dialect: str):
+    """INSERT of empty summary rows that leaves every row, new or existing, locked"""
+    if dialect == "mysql":
+        # A duplicate key takes an exclusive lock here, where INSERT IGNORE would
+        # take a shared one: two writers holding it would deadlock upgrading
+        statement = mysql_insert(RoomDaySummary)
+        return statement.on_duplicate_key_update(sala_id=statement.inserted.sala_id)
+    # SQLite: the first write holds the database lock until the transaction ends
+    return insert(RoomDaySummary).prefix_with("OR IGNORE", dialect="sqlite")
+
+# Room-days whose summary row the session's transaction has locked
+_LOCKED = "room_days_locked"
+
+def lock_room_days(session: Session, keys: Iterable[SlotKey]) -> None:
+    """
+    Lock the summary rows of the given (sala_id, fecha) pairs until the
+    transaction ends, inserting an empty row for each missing one. Call it
+    before writing the reservations of those days (see the lock order above).
+    """
+    locked = session.info.setdefault(_LOCKED, set())
+    keys = sorted(set(keys) - locked)
+    if not keys:
+        return
+
+    # One statement, rows in key order: creates the missing ones and locks them all
+    session.execute(_lock_rows(session.get_bind().dialect.name), [_row(key, _empty_day()) for key in keys])
+    locked.update(keys)
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _release_room_days(session):
+    session.info.pop(_LOCKED, None)
+
+def refresh_room_days(session: Session, keys: Iterable[SlotKey]) -> None:
+    """
+    Recompute the summary of the given (sala_id, fecha) pairs from the
+    reservation table, inside the caller's transaction. Pending changes are
+    flushed first, so the summary reflects what is about to be committed.
+
+    The rows must already be locked with lock_room_days(); any that are not
+    are locked here, which is only safe for callers that hold no reservation
+    row of those days.
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+
+    lock_room_days(session, keys)
+    existing = {
+        (summary.sala_id, summary.fecha): summary
+        for summary in session.exec(
+            select(RoomDaySummary)
+            .where(tuple_(RoomDaySummary.sala_id, RoomDaySummary.fecha).in_(keys))
+            .execution_options(populate_existing=True)
+        ).all()
+    }
+
+    # Under the summary locks no other writer can change these days' reservations
+    days = _summarize(session.exec(
+        select(*_columns).where(tuple_(Reservation.sala_id, Reservation.fecha).in_(keys))
+    ).all())
+
+    for key, summary in existing.items():
+        day = days.get(key)
+        if day is None:
+            session.delete(summary)
+            continue
+        summary.set_mask(day["mask"])
+        for field in COUNT_FIELDS.values():
+            setattr(summary, field, day[field])
+        session.add(summary)
+
+def rebuild_room_day_summary(session: Session, desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+    """Replace the summary rows of [desde, hasta] (everything by default); returns how many were written"""
+    summary_range, reservation_range = [], []
+    if desde:
+        summary_range.append(RoomDaySummary.fecha >= desde)
+        reservation_range.append(Reservation.fecha >= desde)
+    if hasta:
+        summary_range.append(RoomDaySummary.fecha <= hasta)
+        reservation_range.append(Reservation.fecha <= hasta)
+
+    session.exec(delete(RoomDaySummary).where(*summary_range))
+    days = _summarize(session.exec(
+        select(*_columns).where(*reservation_range).execution_options(yield_per=REBUILD_CHUNK_ROWS)
+    ))
+
+    rows = [_row(key, day) for key, day in days.items()]
+    for start in range(0, len(rows), REBUILD_CHUNK_ROWS):
+        session.execute(insert(RoomDaySummary), rows[start:start + REBUILD_CHUNK_ROWS])
+    session.commit()
+    return len(rows)
+
+def ensure_room_day_summary() -> None:
+    """Fill the summary on first start, when the table is new but reservations already exist"""
+    with Session(get_engine()) as session:
+        if session.exec(select(RoomDaySummary.sala_id).limit(1)).first() is not None:
+            return
+        if session.exec(select(func.count()).select_from(Reservation)).one() == 0:
+            return
+        logger.info("\tBuilding room_day_summary from existing reservations...")
+        written = rebuild_room_day_summary(session)
+        logger.info(f"\troom_day_summary: {written} room-days")
+
+if __name__ == "__main__":
+    from backend.core.logs import configure_logging
+
+    parser = argparse.ArgumentParser(description="Rebuild the room_day_summary table")
+    parser.add_argument("--desde", type=date.fromisoformat, help="First date to rebuild (included)")
+    parser.add_argument("--hasta", type=date.fromisoformat, help="Last date to rebuild (included)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging()
+    with Session(get_engine()) as session:
+        written = rebuild_room_day_summary(session, args.desde, args.hasta)
+    logger.info(f"\troom_day_summary rebuilt: {written} room-days")
@@ -0,0 +1,179 @@
+"""
+Per-request timing spans, reported in the Server-Timing header:
+
+    auth     token check in get_current_user
+    db       time spent in the database (with the number of statements)
+    handler  the endpoint function, its own queries included
+    render   validating and serializing what the endpoint returned (the orjson
+             listings render inside the endpoint, so there it overlaps handler)
+    total    until the response starts
+
+Requests slower than SLOW_REQUEST_MS are also kept, with their spans, in a
+ring buffer of the last SLOW_REQUEST_LOG_SIZE that /admin/slow-requests reads.
+"""
+import asyncio
+import functools
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.core.db import current_query_stats
+from backend.core.querystats import DEBUG
+
+# Off unless DEBUG: the header reveals as much as X-DB-Queries/X-DB-Time-Ms
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true" if DEBUG else "false").strip().lower() in ("1", "true", "yes", "on")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "100"))
+
+class Timings:
+    """Seconds spent in each named span of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        # When the endpoint function returned; what follows is rendering
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+# Handlers run in a copy of the request's context (threadpool or event loop),
+# so they all add to the Timings object the middleware set
+_timings: ContextVar[Optional[Timings]] = ContextVar("timings", default=None)
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Add the time spent in the block to span `name` of the current request, if any"""
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+def _handler_returned() -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.handler_end = time.perf_counter()
+
+def _timed_call(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def timed(*args, **kwargs):
+            with span("handler"):
+                result = await call(*args, **kwargs)
+            _handler_returned()
+            return result
+    else:
+        @functools.wraps(call)
+        def timed(*args, **kwargs):
+            with span("handler"):
+                result = call(*args, **kwargs)
+            _handler_returned()
+            return result
+    timed.__timed__ = True
+    return timed
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times the endpoint function ('handler') and everything the
+    route does after it returns: response_model validation, serialization and
+    rendering ('render').
+    """
+
+    def get_route_handler(self) -> Callable:
+        if not getattr(self.dependant.call, "__timed__", False):
+            self.dependant.call = _timed_call(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _timings.get()
+            if timings is not None and timings.handler_end is not None:
+                timings.add("render", time.perf_counter() - timings.handler_end)
+            return response
+
+        return timed_handler
+
+def server_timing_header(timings: Timings, total: float) -> str:
+    entries = []
+    for name in ("auth", "handler", "render"):
+        if name in timings.spans:
+            entries.append(f"{name};dur={timings.spans[name] * 1000:.2f}")
+    stats = current_query_stats()
+    if stats is not None and stats.count:
+        entries.append(f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"')
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+class SlowRequestLog:
+    """The last `maxsize` requests slower than `threshold_ms`; deque appends need no lock"""
+
+    def __init__(self, threshold_ms: float, maxsize: int):
+        self.threshold_ms = threshold_ms
+        self._entries: deque = deque(maxlen=max(maxsize, 1))
+        self.enabled = maxsize > 0
+
+    def record(self, scope: Scope, status_code: int, timings: Timings, total: float) -> None:
+        total_ms = total * 1000
+        if not self.enabled or total_ms < self.threshold_ms:
+            return
+        stats = current_query_stats()
+        route = scope.get("route")
+        self._entries.append({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": getattr(route, "path", None),
+            "status": status_code,
+            "total_ms": round(total_ms, 2),
+            "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in timings.spans.items()},
+            "db_queries": stats.count if stats is not None else None,
+            "db_ms": round(stats.seconds * 1000, 2) if stats is not None else None,
+        })
+
+    def slowest(self, limit: int = 20) -> List[dict]:
+        return sorted(list(self._entries), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+slow_requests = SlowRequestLog(SLOW_REQUEST_MS, SLOW_REQUEST_LOG_SIZE)
+
+class ServerTimingMiddleware:
+    def __init__(self, app: ASGIApp, expose_header: bool = SERVER_TIMING, log: SlowRequestLog = slow_requests):
+        self.app = app
+        self.expose_header = expose_header
+        self.log = log
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not (self.expose_header or self.log.enabled):
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = _timings.set(timings)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - timings.started
+                if self.expose_header:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing_header(timings, total))
+                self.log.record(scope, message["status"], timings, total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
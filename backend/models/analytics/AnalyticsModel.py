@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+from backend.models.rooms.RoomsModel import SedeEnum
+
+# Booked vs. bookable hours of one group; ocupacion = horas_reservadas / horas_disponibles
+class Utilization(SQLModel):
+    horas_reservadas: float
+    horas_disponibles: float
+    ocupacion: float
+
+class SedeUtilization(Utilization):
+    sede: SedeEnum
+    salas: int
+
+class RoomUtilization(Utilization):
+    sala_id: int
+    nombre: str
+    sede: SedeEnum
+
+class WeekdayUtilization(Utilization):
+    dia_semana: int
+    nombre: str
+
+class HourUtilization(Utilization):
+    hora: int
+
+class UtilizationReport(SQLModel):
+    desde: dt.date
+    hasta: dt.date
+    sede: Optional[SedeEnum] = None
+    hora_apertura: int
+    hora_cierre: int
+    total: Utilization
+    por_sede: List[SedeUtilization]
+    por_sala: List[RoomUtilization]
+    por_dia_semana: List[WeekdayUtilization]
+    por_hora: List[HourUtilization]
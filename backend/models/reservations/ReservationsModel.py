@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import datetime as dt
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 class EstadoReservaEnum(str, Enum):
@@ -11,6 +12,10 @@ class EstadoReservaEnum(str, Enum):
     confirmada = "confirmada"
     cancelada = "cancelada"
 
+class ExportFormatEnum(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
 class ReservationBase(SQLModel):
     fecha: dt.date
     hora_inicio: dt.time
@@ -19,11 +24,21 @@ class ReservationBase(SQLModel):
 
 class Reservation(ReservationBase, table=True):
     __tablename__ = "reservation"
+    __table_args__ = (
+        # Slot conflict checks and per-room listings ordered by date and hour
+        Index("ix_reservation_sala_fecha_hora", "sala_id", "fecha", "hora_inicio"),
+        # A user's reservations ordered by date ("my upcoming reservations")
+        Index("ix_reservation_usuario_fecha_hora", "usuario_id", "fecha", "hora_inicio"),
+        # Per-day listings, occupancy day loads and keyset pagination
+        Index("ix_reservation_fecha_hora", "fecha", "hora_inicio"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
     usuario_id: int = Field(foreign_key="user.id", index=True)
     sala_id: int = Field(foreign_key="room.id", index=True)
+    # Set when the reservation was generated by a ReservationSeries
+    serie_id: Optional[int] = Field(default=None, foreign_key="reservation_series.id", index=True)
 
 class ReservationCreate(ReservationBase):
     usuario_id: int
@@ -37,6 +52,7 @@ class ReservationRead(SQLModel):
     hora_inicio: dt.time
     hora_fin: dt.time
     estado: EstadoReservaEnum
+    serie_id: Optional[int] = None
 
 class ReservationUpdate(SQLModel):
     fecha: Optional[dt.date] = None
@@ -47,4 +63,18 @@ class ReservationUpdate(SQLModel):
 # Extended read model that includes user and room details
 class ReservationReadWithDetails(ReservationRead):
     usuario: Optional[dict] = None
-    sala: Optional[dict] = None
\ No newline at end of file
+    sala: Optional[dict] = None
+
+# Result of one item of a bulk creation, in the same position as the request item
+class ReservationBulkItemResult(SQLModel):
+    index: int
+    fecha: dt.date
+    ok: bool
+    status_code: int
+    reservation: Optional[ReservationRead] = None
+    error: Optional[str] = None
+
+class ReservationBulkResult(SQLModel):
+    created: int
+    failed: int
+    results: List[ReservationBulkItemResult]
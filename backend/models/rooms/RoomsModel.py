@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from sqlmodel import Field, SQLModel
 from pydantic import field_validator
@@ -18,45 +18,106 @@ class RecursoEnum(str, Enum):
     proyector = "proyector"
     televisor = "televisor"
 
+# Bit of each resource in Room.recursos_mask; never renumber, values are stored
+RECURSO_BITS: Dict[str, int] = {
+    RecursoEnum.pizarra.value: 1,
+    RecursoEnum.proyector.value: 2,
+    RecursoEnum.televisor.value: 4,
+}
+ALL_RECURSOS_MASK = sum(RECURSO_BITS.values())
+
+def recursos_to_mask(recursos: Iterable[str]) -> int:
+    mask = 0
+    for recurso in recursos:
+        mask |= RECURSO_BITS[recurso]
+    return mask
+
+def mask_to_recursos(mask: int) -> str:
+    """Comma-separated resources of a mask, sorted like the API always returned them"""
+    return ','.join(sorted(r for r, bit in RECURSO_BITS.items() if mask & bit))
+
+def masks_with_all(mask: int) -> List[int]:
+    """Every stored mask that has all the bits of `mask`"""
+    return [m for m in range(ALL_RECURSOS_MASK + 1) if m & mask == mask]
+
+def masks_with_any(mask: int) -> List[int]:
+    """Every stored mask that shares at least one bit with `mask`"""
+    return [m for m in range(ALL_RECURSOS_MASK + 1) if m & mask]
+
+# Spellings found in the free-text column used before recursos_mask
+LEGACY_RECURSO_ALIASES = {"tv": RecursoEnum.televisor.value}
+
+def legacy_recursos_to_mask(recursos: str) -> Tuple[int, List[str]]:
+    """Mask of a legacy free-text resource list, plus the entries that map to no resource"""
+    mask, unknown = 0, []
+    for item in recursos.split(','):
+        name = item.strip().lower()
+        name = LEGACY_RECURSO_ALIASES.get(name, name)
+        if name in RECURSO_BITS:
+            mask |= RECURSO_BITS[name]
+        elif name:
+            unknown.append(item.strip())
+    return mask, unknown
+
+def parse_recursos(v: str) -> str:
+    """Validate a comma-separated resource list and normalize it (no duplicates, sorted)"""
+    if not v or not v.strip():
+        raise ValueError("Debe especificar al menos un recurso")
+
+    # Split by comma and validate each resource
+    recursos_list = [r.strip() for r in v.split(',') if r.strip()]
+    valid_recursos = {r.value for r in RecursoEnum}
+
+    for recurso in recursos_list:
+        if recurso not in valid_recursos:
+            raise ValueError(f"Recurso inválido: {recurso}. Recursos válidos: {', '.join(valid_recursos)}")
+
+    # Remove duplicates and sort for consistency
+    unique_recursos = sorted(set(recursos_list))
+    return ','.join(unique_recursos)
+
 class RoomBase(SQLModel):
     nombre: str = Field(min_length=1, max_length=255)
     sede: SedeEnum
     capacidad: int = Field(gt=0, description="Capacidad máxima de la sala")
-    recursos: str = Field(description="Recursos disponibles en la sala")
 
-    @field_validator('recursos')
-    @classmethod
-    def validate_recursos(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError("Debe especificar al menos un recurso")
-        
-        # Split by comma and validate each resource
-        recursos_list = [r.strip() for r in v.split(',') if r.strip()]
-        valid_recursos = {r.value for r in RecursoEnum}
-        
-        for recurso in recursos_list:
-            if recurso not in valid_recursos:
-                raise ValueError(f"Recurso inválido: {recurso}. Recursos válidos: {', '.join(valid_recursos)}")
-        
-        # Remove duplicates and sort for consistency
-        unique_recursos = sorted(set(recursos_list))
-        return ','.join(unique_recursos)
+class Room(RoomBase, table=True):
+    __tablename__ = "room"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # One bit per RecursoEnum (see RECURSO_BITS); filters match it against an IN list of masks
+    recursos_mask: int = Field(default=0, index=True, sa_column_kwargs={"server_default": "0"})
+
+    def __init__(self, **data):
+        # Accept the API's string form as well
+        recursos = data.pop("recursos", None)
+        super().__init__(**data)
+        if recursos is not None:
+            self.recursos = recursos
+
+    @property
+    def recursos(self) -> str:
+        return mask_to_recursos(self.recursos_mask)
+
+    @recursos.setter
+    def recursos(self, value: str) -> None:
+        self.recursos_mask = recursos_to_mask(value.split(','))
 
     def get_recursos_set(self) -> Set[str]:
         """Retorna los recursos como un conjunto"""
-        return set(r.strip() for r in self.recursos.split(',') if r.strip())
+        return {r for r, bit in RECURSO_BITS.items() if self.recursos_mask & bit}
 
     def has_recurso(self, recurso: str) -> bool:
         """Verifica si la sala tiene un recurso específico"""
-        return recurso in self.get_recursos_set()
-
-class Room(RoomBase, table=True):
-    __tablename__ = "room"
-
-    id: Optional[int] = Field(default=None, primary_key=True)
+        return bool(self.recursos_mask & RECURSO_BITS.get(recurso, 0))
 
 class RoomCreate(RoomBase):
-    pass
+    recursos: str = Field(description="Recursos disponibles en la sala")
+
+    @field_validator('recursos')
+    @classmethod
+    def validate_recursos(cls, v: str) -> str:
+        return parse_recursos(v)
 
 class RoomRead(SQLModel):
     id: int
@@ -71,6 +132,11 @@ class RoomUpdate(SQLModel):
     capacidad: Optional[int] = None
     recursos: Optional[str] = None
 
+    @field_validator('recursos')
+    @classmethod
+    def validate_recursos(cls, v: Optional[str]) -> Optional[str]:
+        return None if v is None else parse_recursos(v)
+
 # Extended read model that includes reservations when needed
 class RoomReadWithReservations(RoomRead):
     reservas: Optional[List[dict]] = None
\ No newline at end of file
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import datetime as dt
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import field_validator
+from sqlmodel import Field, SQLModel
+
+from backend.models.reservations.ReservationsModel import ReservationBulkItemResult
+
+class FrecuenciaEnum(str, Enum):
+    diaria = "diaria"
+    semanal = "semanal"
+
+class DiaSemanaEnum(str, Enum):
+    # Declared in date.weekday() order
+    lunes = "lunes"
+    martes = "martes"
+    miercoles = "miercoles"
+    jueves = "jueves"
+    viernes = "viernes"
+    sabado = "sabado"
+    domingo = "domingo"
+
+DIAS_SEMANA = [d.value for d in DiaSemanaEnum]
+
+class EstadoSerieEnum(str, Enum):
+    activa = "activa"
+    cancelada = "cancelada"
+
+class ReservationSeriesBase(SQLModel):
+    fecha_inicio: dt.date
+    fecha_fin: dt.date = Field(description="Última fecha (incluida) en la que puede caer una reserva")
+    hora_inicio: dt.time
+    hora_fin: dt.time
+    frecuencia: FrecuenciaEnum = Field(default=FrecuenciaEnum.semanal)
+    intervalo: int = Field(default=1, ge=1, description="Cada cuántos días o semanas se repite")
+    dias_semana: Optional[str] = Field(
+        default=None,
+        description="Días separados por comas (p. ej. 'lunes,miercoles'); por defecto, el día de fecha_inicio",
+    )
+
+    @field_validator('dias_semana')
+    @classmethod
+    def validate_dias_semana(cls, v: Optional[str]) -> Optional[str]:
+        if v is None or not v.strip():
+            return None
+
+        dias = {d.strip() for d in v.split(',') if d.strip()}
+        for dia in dias:
+            if dia not in DIAS_SEMANA:
+                raise ValueError(f"Día inválido: {dia}. Días válidos: {', '.join(DIAS_SEMANA)}")
+
+        # Keep them in calendar order
+        return ','.join(d for d in DIAS_SEMANA if d in dias)
+
+    def get_weekdays(self) -> List[int]:
+        """Weekdays (date.weekday() numbers) on which the series has a reservation"""
+        if not self.dias_semana:
+            return [self.fecha_inicio.weekday()]
+        return [DIAS_SEMANA.index(d) for d in self.dias_semana.split(',')]
+
+class ReservationSeries(ReservationSeriesBase, table=True):
+    __tablename__ = "reservation_series"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    usuario_id: int = Field(foreign_key="user.id", index=True)
+    sala_id: int = Field(foreign_key="room.id", index=True)
+    estado: EstadoSerieEnum = Field(default=EstadoSerieEnum.activa)
+
+class ReservationSeriesCreate(ReservationSeriesBase):
+    usuario_id: int
+    sala_id: int
+
+class ReservationSeriesRead(SQLModel):
+    id: int
+    usuario_id: int
+    sala_id: int
+    fecha_inicio: dt.date
+    fecha_fin: dt.date
+    hora_inicio: dt.time
+    hora_fin: dt.time
+    frecuencia: FrecuenciaEnum
+    intervalo: int
+    dias_semana: Optional[str]
+    estado: EstadoSerieEnum
+
+class ReservationSeriesUpdate(SQLModel):
+    sala_id: Optional[int] = None
+    hora_inicio: Optional[dt.time] = None
+    hora_fin: Optional[dt.time] = None
+
+# Series created together with the outcome of each generated date
+class ReservationSeriesCreated(SQLModel):
+    serie: ReservationSeriesRead
+    created: int
+    failed: int
+    results: List[ReservationBulkItemResult]
+
+# Outcome of a series-wide cancel or update
+class ReservationSeriesChange(SQLModel):
+    serie: ReservationSeriesRead
+    affected: int
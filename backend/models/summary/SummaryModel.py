@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from sqlalchemy import Column, Index, LargeBinary
+from sqlmodel import Field, SQLModel
+
+# One bit per minute of the day (see backend.core.occupancy), packed little-endian
+MASK_BYTES = 24 * 60 // 8
+
+class RoomDaySummary(SQLModel, table=True):
+    """
+    Per room and day digest of the reservation table: the booked minutes as a
+    bitmask and how many reservations are in each estado. Kept up to date in
+    the same transaction as the reservations it summarizes.
+    """
+    __tablename__ = "room_day_summary"
+    __table_args__ = (
+        # Date-range reads across every room (utilization reports)
+        Index("ix_room_day_summary_fecha", "fecha"),
+    )
+
+    sala_id: int = Field(foreign_key="room.id", primary_key=True)
+    fecha: dt.date = Field(primary_key=True)
+    # Minutes booked by non-cancelled reservations
+    mask: bytes = Field(default=bytes(MASK_BYTES), sa_column=Column(LargeBinary(MASK_BYTES), nullable=False))
+    pendientes: int = Field(default=0)
+    confirmadas: int = Field(default=0)
+    canceladas: int = Field(default=0)
+
+    def get_mask(self) -> int:
+        return int.from_bytes(self.mask, "little")
+
+    def set_mask(self, mask: int) -> None:
+        self.mask = mask.to_bytes(MASK_BYTES, "little")
@@ -0,0 +1,27 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+
+from backend.core import db
+from backend.core.pool import instrumented_pools, log_pool_status, pool_status
+from backend.core.timing import TimedRoute, slow_requests
+from app.auth.controller import require_admin
+from app.auth.model import TokenData
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=TimedRoute)
+
+@router.get("/pool", response_model=List[dict])
+async def get_pool_status(current_user: TokenData = Depends(require_admin)):
+    """Connection pool usage and checkout wait histogram - requires admin role"""
+    pools = instrumented_pools(db.engine, db.async_engine)
+    for pool in pools:
+        log_pool_status(pool)
+    return [pool_status(pool) for pool in pools]
+
+@router.get("/slow-requests", response_model=List[dict])
+async def get_slow_requests(
+    limit: int = Query(20, ge=1, le=1000),
+    current_user: TokenData = Depends(require_admin),
+):
+    """Slowest recent requests with their auth/handler/render/db breakdown - requires admin role"""
+    return slow_requests.slowest(limit)
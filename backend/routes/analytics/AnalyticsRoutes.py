@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.controllers.analytics.AnalyticsController import AsyncAnalyticsController
+from backend.core.db import get_async_session
+from backend.core.timing import TimedRoute
+from backend.models.analytics.AnalyticsModel import UtilizationReport
+from backend.models.rooms.RoomsModel import SedeEnum
+from app.auth.controller import require_admin
+from app.auth.model import TokenData
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=TimedRoute)
+
+
+@router.get("/utilization", response_model=UtilizationReport)
+async def get_utilization(
+    desde: date = Query(..., description="Desde esta fecha (incluida)"),
+    hasta: date = Query(..., description="Hasta esta fecha (incluida)"),
+    sede: Optional[SedeEnum] = Query(None, description="Filtrar por sede"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(require_admin)
+):
+    """Room occupancy by sede, room, weekday and hour - requires admin role"""
+    return await AsyncAnalyticsController(session).get_utilization(desde, hasta, sede=sede)
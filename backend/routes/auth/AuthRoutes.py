@@ -1,17 +1,18 @@
 from fastapi import APIRouter, Depends, status
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.auth.controller import AuthController, get_current_user
+from app.auth.controller import AsyncAuthController, get_current_user
 from app.auth.model import UserRegisterRequest, UserLogin, Token
-from backend.core.db import get_session
-from backend.controllers.users.UsersController import UsersController
+from backend.core.db import get_async_session
+from backend.core.timing import TimedRoute
+from backend.controllers.users.UsersController import AsyncUsersController
 
-router = APIRouter(prefix="/auth", tags=["authentication"])
+router = APIRouter(prefix="/auth", tags=["authentication"], route_class=TimedRoute)
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(
+async def register(
     user_data: UserRegisterRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Register a new user
@@ -23,13 +24,13 @@ def register(
     
     Returns JWT token for immediate authentication
     """
-    auth_controller = AuthController(session)
-    return auth_controller.register_user(user_data)
+    auth_controller = AsyncAuthController(session)
+    return await auth_controller.register_user(user_data)
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     login_data: UserLogin,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Authenticate user and get access token
@@ -39,11 +40,11 @@ def login(
     
     Returns JWT token for API access
     """
-    auth_controller = AuthController(session)
-    return auth_controller.login_user(login_data)
+    auth_controller = AsyncAuthController(session)
+    return await auth_controller.login_user(login_data)
 
 @router.post("/verify-token")
-def verify_token(
+async def verify_token(
     current_user = Depends(get_current_user)
 ):
     """
@@ -59,15 +60,15 @@ def verify_token(
     }
 
 @router.get("/me")
-def get_current_user_profile(
+async def get_current_user_profile(
     current_user = Depends(get_current_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Get current authenticated user profile
     
     Requires Authorization header with Bearer token
     """
-    users_controller = UsersController(session)
-    user = users_controller.get_user(current_user.user_id)
+    users_controller = AsyncUsersController(session)
+    user = await users_controller.get_user(current_user.user_id)
     return user
\ No newline at end of file
@@ -0,0 +1,23 @@
+import hmac
+import os
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from backend.core.metrics import CONTENT_TYPE, render
+
+router = APIRouter(tags=["metrics"])
+
+# Bearer token Prometheus must send; empty leaves /metrics open (e.g. behind an internal network)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: str = Header(default="")):
+    """Metrics in the Prometheus text format"""
+    if METRICS_TOKEN and not hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
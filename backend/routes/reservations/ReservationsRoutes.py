@@ -1,103 +1,158 @@
-from typing import List
+from typing import List, Optional
 from datetime import date
 
-from fastapi import APIRouter, Depends, Query, status, Path
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Response, status, Path
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.controllers.reservations.ReservationsController import ReservationsController
-from backend.core.db import get_session
+from backend.controllers.reservations.ReservationsController import ReservationsController, AsyncReservationsController, ReservationsExporter
+from backend.core.db import get_async_session
+from backend.core.responses import fast_json
+from backend.core.etag import conditional_get
+from backend.core.timing import TimedRoute
 from backend.models.reservations.ReservationsModel import *
+from backend.models.rooms.RoomsModel import SedeEnum
 from app.auth.controller import get_current_user, require_admin
 from app.auth.model import TokenData
 
-router = APIRouter(prefix="/reservations", tags=["reservations"])
+router = APIRouter(prefix="/reservations", tags=["reservations"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=ReservationRead, status_code=status.HTTP_201_CREATED)
-def create_reservation(
+async def create_reservation(
     data: ReservationCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Create a new reservation - requires authentication"""
-    return ReservationsController(session).create_reservation(data)
+    return await AsyncReservationsController(session).create_reservation(data)
+
+
+@router.post("/bulk", response_model=ReservationBulkResult)
+async def create_reservations_bulk(
+    items: List[ReservationCreate],
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Create several reservations at once; reports the outcome of each item - requires authentication"""
+    return await AsyncReservationsController(session).create_reservations_bulk(items)
 
 
 @router.get("/", response_model=List[ReservationReadWithDetails])
-def list_reservations(
+async def list_reservations(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get all reservations with user and room details - requires authentication"""
-    return ReservationsController(session).list_reservations_with_details(skip=skip, limit=limit)
+    reservations = await AsyncReservationsController(session).list_reservations_with_details(
+        skip=skip, limit=limit, cursor=cursor
+    )
+    ReservationsController.keyset.set_next_cursor(response, reservations, limit)
+    return fast_json(reservations, response)
 
 
 @router.get("/me", response_model=List[ReservationReadWithDetails])
-def get_my_reservations(
+async def get_my_reservations(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get current user's reservations with details"""
-    return ReservationsController(session).get_reservations_by_user(
-        current_user.user_id, skip=skip, limit=limit
+    reservations = await AsyncReservationsController(session).get_reservations_by_user(
+        current_user.user_id, skip=skip, limit=limit, cursor=cursor
+    )
+    ReservationsController.keyset.set_next_cursor(response, reservations, limit)
+    return fast_json(reservations, response)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_reservations(
+    format: ExportFormatEnum = Query(ExportFormatEnum.csv, description="csv o ndjson"),
+    desde: Optional[date] = Query(None, description="Desde esta fecha (incluida)"),
+    hasta: Optional[date] = Query(None, description="Hasta esta fecha (incluida)"),
+    sede: Optional[SedeEnum] = Query(None, description="Filtrar por sede"),
+    current_user: TokenData = Depends(require_admin)
+):
+    """Stream every matching reservation as CSV or NDJSON - requires admin role"""
+    exporter = ReservationsExporter(desde=desde, hasta=hasta, sede=sede)
+    return StreamingResponse(
+        exporter.stream(format),
+        media_type=ReservationsExporter.media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="reservas.{format.value}"'},
     )
 
 
 @router.get("/room/{room_id}", response_model=List[ReservationReadWithDetails])
-def get_reservations_by_room(
+async def get_reservations_by_room(
+    response: Response,
     room_id: int = Path(..., description="ID of the room"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
-    current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user),  # Added authentication requirement
+    _etag: None = Depends(conditional_get("reservation", "user", "room"))
 ):
     """Get all reservations for a specific room - requires authentication"""
-    return ReservationsController(session).get_reservations_by_room(room_id, skip=skip, limit=limit)
+    reservations = await AsyncReservationsController(session).get_reservations_by_room(
+        room_id, skip=skip, limit=limit, cursor=cursor
+    )
+    ReservationsController.keyset.set_next_cursor(response, reservations, limit)
+    return fast_json(reservations, response)
 
 
 @router.get("/date/{reservation_date}", response_model=List[ReservationReadWithDetails])
-def get_reservations_by_date(
+async def get_reservations_by_date(
+    response: Response,
     reservation_date: date = Path(..., description="Date in YYYY-MM-DD format"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
 ):
     """Get all reservations for a specific date - requires authentication"""
-    return ReservationsController(session).get_reservations_by_date(reservation_date, skip=skip, limit=limit)
+    reservations = await AsyncReservationsController(session).get_reservations_by_date(
+        reservation_date, skip=skip, limit=limit, cursor=cursor
+    )
+    ReservationsController.keyset.set_next_cursor(response, reservations, limit)
+    return fast_json(reservations, response)
 
 
 @router.delete("/{reservation_id}", response_model=ReservationRead)
-def cancel_reservation(
+async def cancel_reservation(
     reservation_id: int = Path(..., description="ID of the reservation to cancel"),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Cancel a reservation (sets status to 'cancelada') - requires authentication"""
-    return ReservationsController(session).cancel_reservation(reservation_id)
+    return await AsyncReservationsController(session).cancel_reservation(reservation_id)
 
 
 # Keep existing endpoints for backward compatibility
 @router.get("/{reservation_id}", response_model=ReservationRead)
-def get_reservation(
+async def get_reservation(
     reservation_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
 ):
     """Get a specific reservation by ID - requires authentication"""
-    return ReservationsController(session).get_reservation(reservation_id)
+    return await AsyncReservationsController(session).get_reservation(reservation_id)
 
 
 @router.patch("/{reservation_id}", response_model=ReservationRead)
-def update_reservation(
+async def update_reservation(
     reservation_id: int, 
     data: ReservationUpdate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Update a reservation - requires authentication"""
-    return ReservationsController(session).update_reservation(reservation_id, data)
\ No newline at end of file
+    return await AsyncReservationsController(session).update_reservation(reservation_id, data)
\ No newline at end of file
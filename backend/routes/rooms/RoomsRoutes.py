@@ -1,69 +1,100 @@
+from datetime import date, time
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.controllers.rooms.RoomsController import RoomsController
-from backend.core.db import get_session
+from backend.controllers.rooms.RoomsController import RoomsController, AsyncRoomsController
+from backend.core.db import get_async_session
+from backend.core.etag import conditional_get
+from backend.core.timing import TimedRoute
 from backend.models.rooms.RoomsModel import RoomCreate, RoomRead, RoomUpdate, SedeEnum
 from app.auth.controller import get_current_user, require_admin
 from app.auth.model import TokenData
 
-router = APIRouter(prefix="/rooms", tags=["rooms"])
+router = APIRouter(prefix="/rooms", tags=["rooms"], route_class=TimedRoute)
 
 
 @router.get("/", response_model=List[RoomRead])
-def list_rooms(
+async def list_rooms(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     sede: Optional[SedeEnum] = Query(None, description="Filtrar por sede"),
     recurso: Optional[str] = Query(None, description="Filtrar por recurso específico"),
-    session: Session = Depends(get_session),
-    current_user: TokenData = Depends(get_current_user)
+    recursos: Optional[str] = Query(None, description="Salas con todos estos recursos (separados por comas)"),
+    recursos_alguno: Optional[str] = Query(None, description="Salas con al menos uno de estos recursos (separados por comas)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user),
+    _etag: None = Depends(conditional_get("room"))
 ):
     """List rooms - requires authentication"""
-    return RoomsController(session).list_rooms(
-        skip=skip, limit=limit, sede=sede, recurso=recurso
+    rooms = await AsyncRoomsController(session).list_rooms(
+        skip=skip, limit=limit, sede=sede, recurso=recurso, cursor=cursor,
+        recursos=recursos, recursos_alguno=recursos_alguno
+    )
+    RoomsController.keyset.set_next_cursor(response, rooms, limit)
+    return rooms
+
+
+@router.get("/available", response_model=List[RoomRead])
+async def list_available_rooms(
+    fecha: date = Query(..., description="Fecha en formato YYYY-MM-DD"),
+    hora_inicio: time = Query(..., description="Hora de inicio (HH:MM) de la reserva de 1 hora"),
+    sede: Optional[SedeEnum] = Query(None, description="Filtrar por sede"),
+    capacidad_min: Optional[int] = Query(None, ge=1, description="Capacidad mínima"),
+    recurso: Optional[str] = Query(None, description="Filtrar por recurso específico"),
+    recursos: Optional[str] = Query(None, description="Salas con todos estos recursos (separados por comas)"),
+    recursos_alguno: Optional[str] = Query(None, description="Salas con al menos uno de estos recursos (separados por comas)"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """List rooms that are free for a one-hour slot - requires authentication"""
+    return await AsyncRoomsController(session).list_available_rooms(
+        fecha=fecha, hora_inicio=hora_inicio, sede=sede, capacidad_min=capacidad_min, recurso=recurso,
+        recursos=recursos, recursos_alguno=recursos_alguno
     )
 
 
 @router.get("/{room_id}", response_model=RoomRead)
-def get_room(
+async def get_room(
     room_id: int, 
-    session: Session = Depends(get_session),
-    current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user),  # Added authentication requirement
+    _etag: None = Depends(conditional_get("room"))
 ):
     """Get room by ID - requires authentication"""
-    return RoomsController(session).get_room(room_id)
+    return await AsyncRoomsController(session).get_room(room_id)
 
 
 @router.post("/", response_model=RoomRead, status_code=status.HTTP_201_CREATED)
-def create_room(
+async def create_room(
     data: RoomCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Create room - requires admin privileges"""
-    return RoomsController(session).create_room(data)
+    return await AsyncRoomsController(session).create_room(data)
 
 
 @router.patch("/{room_id}", response_model=RoomRead)
-def update_room(
+async def update_room(
     room_id: int, 
     data: RoomUpdate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Update room - requires admin privileges"""
-    return RoomsController(session).update_room(room_id, data)
+    return await AsyncRoomsController(session).update_room(room_id, data)
 
 
 @router.delete("/{room_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_room(
+async def delete_room(
     room_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Delete room - requires admin privileges"""
-    RoomsController(session).delete_room(room_id)
+    await AsyncRoomsController(session).delete_room(room_id)
     return None
\ No newline at end of file
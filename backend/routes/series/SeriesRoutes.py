@@ -0,0 +1,93 @@
+from typing import List, Optional
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Response, status, Path
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.controllers.series.SeriesController import SeriesController, AsyncSeriesController
+from backend.controllers.reservations.ReservationsController import ReservationsController
+from backend.core.db import get_async_session
+from backend.core.responses import fast_json
+from backend.core.timing import TimedRoute
+from backend.models.reservations.ReservationsModel import ReservationReadWithDetails
+from backend.models.series.SeriesModel import *
+from app.auth.controller import get_current_user
+from app.auth.model import TokenData
+
+router = APIRouter(prefix="/series", tags=["series"], route_class=TimedRoute)
+
+
+@router.post("/", response_model=ReservationSeriesCreated, status_code=status.HTTP_201_CREATED)
+async def create_series(
+    data: ReservationSeriesCreate,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Create a recurring series and all its reservations - requires authentication"""
+    return await AsyncSeriesController(session).create_series(data)
+
+
+@router.get("/", response_model=List[ReservationSeriesRead])
+async def list_series(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """List all reservation series - requires authentication"""
+    series = await AsyncSeriesController(session).list_series(skip=skip, limit=limit, cursor=cursor)
+    SeriesController.keyset.set_next_cursor(response, series, limit)
+    return series
+
+
+@router.get("/{serie_id}", response_model=ReservationSeriesRead)
+async def get_series(
+    serie_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get a reservation series by ID - requires authentication"""
+    return await AsyncSeriesController(session).get_series(serie_id)
+
+
+@router.get("/{serie_id}/reservations", response_model=List[ReservationReadWithDetails])
+async def get_series_reservations(
+    response: Response,
+    serie_id: int = Path(..., description="ID of the series"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get the reservations generated by a series - requires authentication"""
+    reservations = await AsyncSeriesController(session).get_series_reservations(
+        serie_id, skip=skip, limit=limit, cursor=cursor
+    )
+    ReservationsController.keyset.set_next_cursor(response, reservations, limit)
+    return fast_json(reservations, response)
+
+
+@router.patch("/{serie_id}", response_model=ReservationSeriesChange)
+async def update_series(
+    data: ReservationSeriesUpdate,
+    serie_id: int = Path(..., description="ID of the series"),
+    desde: Optional[date] = Query(None, description="Solo cambia las reservas desde esta fecha (por defecto, hoy)"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Change room and/or hours of all active reservations of the series - requires authentication"""
+    return await AsyncSeriesController(session).update_series(serie_id, data, desde=desde)
+
+
+@router.delete("/{serie_id}", response_model=ReservationSeriesChange)
+async def cancel_series(
+    serie_id: int = Path(..., description="ID of the series to cancel"),
+    desde: Optional[date] = Query(None, description="Solo cancela las reservas desde esta fecha (por defecto, hoy)"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Cancel a series and its reservations - requires authentication"""
+    return await AsyncSeriesController(session).cancel_series(serie_id, desde=desde)
@@ -1,70 +1,78 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Response, status
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from backend.controllers.users.UsersController import UsersController
-from backend.core.db import get_session
+from backend.controllers.users.UsersController import UsersController, AsyncUsersController
+from backend.core.db import get_async_session
+from backend.core.etag import conditional_get
+from backend.core.timing import TimedRoute
 from backend.models.users.UsersModel import UserCreate, UserRead, UserUpdate
 from app.auth.controller import get_current_user, require_admin
 from app.auth.model import TokenData
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TimedRoute)
 
 @router.get("/", response_model=List[UserRead])
-def list_users(
+async def list_users(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: Session = Depends(get_session),
-    current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (cabecera X-Next-Cursor); si se envía, se ignora skip"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user),  # Added authentication requirement
+    _etag: None = Depends(conditional_get("user"))
 ):
     """List all users - requires authentication"""
-    return UsersController(session).list_users(skip=skip, limit=limit)
+    users = await AsyncUsersController(session).list_users(skip=skip, limit=limit, cursor=cursor)
+    UsersController.keyset.set_next_cursor(response, users, limit)
+    return users
 
 @router.get("/me", response_model=UserRead)
-def get_current_user_profile(
-    session: Session = Depends(get_session),
+async def get_current_user_profile(
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get current authenticated user profile"""
-    return UsersController(session).get_user(current_user.user_id)
+    return await AsyncUsersController(session).get_user(current_user.user_id)
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(
+async def get_user(
     user_id: int, 
-    session: Session = Depends(get_session),
-    current_user: TokenData = Depends(get_current_user)  # Added authentication requirement
+    session: AsyncSession = Depends(get_async_session),
+    current_user: TokenData = Depends(get_current_user),  # Added authentication requirement
+    _etag: None = Depends(conditional_get("user"))
 ):
     """Get user by ID - requires authentication"""
-    return UsersController(session).get_user(user_id)
+    return await AsyncUsersController(session).get_user(user_id)
 
 @router.post(
     "/", response_model=UserRead, status_code=status.HTTP_201_CREATED
 )
-def create_user(
+async def create_user(
     data: UserCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Create new user - requires admin privileges"""
-    return UsersController(session).create_user(data)
+    return await AsyncUsersController(session).create_user(data)
 
 @router.patch("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     user_id: int, 
     data: UserUpdate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Update user - requires admin privileges"""
-    return UsersController(session).update_user(user_id, data)
+    return await AsyncUsersController(session).update_user(user_id, data)
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: int, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: TokenData = Depends(require_admin)
 ):
     """Delete user - requires admin privileges"""
-    UsersController(session).delete_user(user_id)
+    await AsyncUsersController(session).delete_user(user_id)
     return None
\ No newline at end of file
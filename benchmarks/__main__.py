@@ -0,0 +1,148 @@
+"""
+Benchmark suite for the API.
+
+    python -m benchmarks run [--users 50 --rooms 20 --reservations 5000]
+                             [--requests 200 --concurrency 10] [--iterations 50]
+                             [--only reservations,serialize] [--no-load] [--no-micro]
+                             [--output results.json]
+    python -m benchmarks compare baseline.json current.json [--metric p95_ms] [--threshold 0.10]
+
+`run` seeds a temporary SQLite database, serves app.main:app on it with
+uvicorn in a background thread, drives every router with concurrent clients
+and runs the controller and serialization micro-benchmarks. The results are
+written as JSON so two versions can be compared; `compare` exits with status
+1 when a benchmark got slower than the threshold.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger("benchmarks")
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def run(args: argparse.Namespace) -> int:
+    # Quiet application logs and no console thread; set before app.main is imported
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("LOG_LEVELS", "benchmarks=INFO")
+    os.environ.setdefault("ENABLE_CONSOLE_INTERFACE", "false")
+    # X-DB-Queries headers, checked against each endpoint's query budget
+    os.environ.setdefault("DEBUG", "true")
+
+    import app.main
+    from app.auth.service import password_pool
+    from benchmarks.database import SeedSize, StandInDatabase
+    from benchmarks.load import run_load
+    from benchmarks.micro import run_micro
+    from benchmarks.server import ServerThread
+
+    only = [name.strip() for name in args.only.split(",")] if args.only else None
+    size = SeedSize(users=args.users, rooms=args.rooms, reservations=args.reservations, seed=args.seed)
+
+    database = StandInDatabase()
+    server = None
+    try:
+        started = time.perf_counter()
+        database.install()
+        seeded = database.seed(size)
+        logger.info(f"\tSeeded {seeded['users']} users, {seeded['rooms']} rooms, "
+                    f"{seeded['reservations']} reservations in {time.perf_counter() - started:.1f}s")
+
+        results = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "params": {k: v for k, v in vars(args).items() if k != "func"},
+            },
+            "load": {},
+            "micro": {},
+        }
+
+        if not args.no_micro:
+            logger.info("\tMicro-benchmarks")
+            results["micro"] = run_micro(database.engine, seeded, iterations=args.iterations, only=only)
+
+        if not args.no_load:
+            server = ServerThread(app.main.app).start()
+            logger.info(f"\tLoad: {args.requests} requests per endpoint, {args.concurrency} clients ({server.base_url})")
+            results["load"] = asyncio.run(run_load(
+                server.base_url, seeded, requests=args.requests, concurrency=args.concurrency, only=only, seed=args.seed,
+            ))
+
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
+        logger.info(f"\tResults written to {args.output}")
+    finally:
+        if server is not None:
+            server.stop()
+        password_pool.shutdown()
+        database.dispose()
+
+    errors = sum(stats["errors"] + stats.get("over_budget", 0) for stats in results["load"].values())
+    return 1 if errors else 0
+
+def compare_results(args: argparse.Namespace) -> int:
+    from benchmarks.stats import compare
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows, regressions = compare(baseline, current, metric=args.metric, threshold=args.threshold)
+    print(f"{'benchmark':<56} {'baseline':>10} {'current':>10} {'change':>9}   ({args.metric})")
+    for section, name, before, after, change in rows:
+        flag = "  <-- slower" if f"{section}/{name}" in regressions else ""
+        print(f"{section + '/' + name:<56} {before:>10.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="GERESACO benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Seed a temporary database and benchmark the API")
+    run_parser.add_argument("--users", type=int, default=50)
+    run_parser.add_argument("--rooms", type=int, default=20)
+    run_parser.add_argument("--reservations", type=int, default=5000)
+    run_parser.add_argument("--seed", type=int, default=1, help="Seed of the generated data and requests")
+    run_parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    run_parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients per endpoint")
+    run_parser.add_argument("--iterations", type=int, default=50, help="Iterations per micro-benchmark")
+    run_parser.add_argument("--only", help="Comma-separated name prefixes, e.g. 'reservations,serialize'")
+    run_parser.add_argument("--no-load", action="store_true", help="Skip the HTTP load")
+    run_parser.add_argument("--no-micro", action="store_true", help="Skip the micro-benchmarks")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--metric", default="p95_ms")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    compare_parser.set_defaults(func=compare_results)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
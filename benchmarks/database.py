@@ -0,0 +1,119 @@
+"""
+Local database stand-in for the benchmarks: a temporary SQLite file set up
+through the application's own bootstrap (DATABASE_URL=sqlite:///...) and
+seeded with a reproducible data set.
+"""
+import os
+import random
+import shutil
+import tempfile
+from dataclasses import dataclass
+from datetime import date, time, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from backend.core import db
+
+BENCH_PASSWORD = "benchpass"
+ADMIN_EMAIL = "admin@bench.geresaco.co"
+USER_EMAIL = "user1@bench.geresaco.co"
+
+# Bookable hours per room and day in the seeded data (08:00 - 18:00)
+SEED_HOURS = range(8, 18)
+
+@dataclass
+class SeedSize:
+    users: int = 50
+    rooms: int = 20
+    reservations: int = 5000
+    seed: int = 1
+
+class StandInDatabase:
+    """Temporary SQLite file the application is pointed at through DATABASE_URL"""
+
+    def __init__(self):
+        self.directory = tempfile.mkdtemp(prefix="geresaco-bench-")
+        self.path = os.path.join(self.directory, "bench.db")
+
+    def install(self) -> None:
+        """Point the application at this database and create its tables"""
+        os.environ["DATABASE_URL"] = f"sqlite:///{self.path}"
+        os.environ.setdefault("DB_POOL_SIZE", "10")
+        os.environ.setdefault("DB_MAX_OVERFLOW", "20")
+        db.engine = db.async_engine = None
+        db.create_db_and_tables()
+        self.engine = db.get_engine()
+        self.async_engine = db.get_async_engine()
+
+    def seed(self, size: SeedSize) -> dict:
+        """Insert users, rooms and non-overlapping reservations; returns what was created"""
+        from app.auth.service import AuthService
+        from backend.core.occupancy import occupancy_index
+        from backend.core.summary import rebuild_room_day_summary
+        from backend.models.users.UsersModel import User, RolEnum
+        from backend.models.rooms.RoomsModel import Room, SedeEnum, ALL_RECURSOS_MASK
+        from backend.models.reservations.ReservationsModel import Reservation, EstadoReservaEnum
+
+        rng = random.Random(size.seed)
+        # One bcrypt hash shared by every user: seeding should not take minutes
+        password_hash = AuthService().get_password_hash(BENCH_PASSWORD)
+        users = [
+            {
+                "nombre": "Admin" if i == 0 else f"Usuario {i}",
+                "email": ADMIN_EMAIL if i == 0 else f"user{i}@bench.geresaco.co",
+                "contrasena_hash": password_hash,
+                "rol": RolEnum.admin if i == 0 else RolEnum.user,
+            }
+            for i in range(max(size.users, 2))
+        ]
+        sedes = list(SedeEnum)
+        rooms = [
+            {
+                "nombre": f"Sala {i + 1}",
+                "sede": sedes[i % len(sedes)],
+                "capacidad": rng.choice([4, 6, 8, 10, 20]),
+                "recursos_mask": rng.randint(0, ALL_RECURSOS_MASK),
+            }
+            for i in range(max(size.rooms, 1))
+        ]
+
+        # Walk (day, room, hour) so no two reservations overlap
+        start = date.today()
+        per_day = len(rooms) * len(SEED_HOURS)
+        estados = [EstadoReservaEnum.pendiente, EstadoReservaEnum.confirmada, EstadoReservaEnum.cancelada]
+        reservations = []
+        for i in range(size.reservations):
+            day, rest = divmod(i, per_day)
+            room, hour = divmod(rest, len(SEED_HOURS))
+            hora = SEED_HOURS[hour]
+            reservations.append({
+                "fecha": start + timedelta(days=day),
+                "hora_inicio": time(hora),
+                "hora_fin": time(hora + 1),
+                "estado": rng.choices(estados, weights=[6, 3, 1])[0],
+                "usuario_id": rng.randint(1, len(users)),
+                "sala_id": room + 1,
+            })
+
+        with Session(self.engine) as session:
+            session.execute(insert(User), users)
+            session.execute(insert(Room), rooms)
+            for chunk in range(0, len(reservations), 5000):
+                session.execute(insert(Reservation), reservations[chunk:chunk + 5000])
+            session.commit()
+            rebuild_room_day_summary(session)
+
+        occupancy_index.clear()
+        days = (size.reservations + per_day - 1) // per_day
+        return {
+            "users": len(users),
+            "rooms": len(rooms),
+            "reservations": len(reservations),
+            "first_date": start,
+            "last_date": start + timedelta(days=max(days - 1, 0)),
+        }
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,234 @@
+"""
+Concurrent load against every router of the API. Each endpoint is driven on
+its own, with `concurrency` clients sharing a fixed number of requests, so
+the numbers of one endpoint are not polluted by another's.
+"""
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from backend.core.querystats import QUERIES_HEADER, QueryBudgetExceeded, assert_query_budget
+from benchmarks.database import ADMIN_EMAIL, BENCH_PASSWORD, USER_EMAIL
+from benchmarks.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+WARMUP_REQUESTS = 3
+
+class LoadContext:
+    """Shared state of a run: tokens, seeded ranges and generators of conflict-free slots"""
+
+    def __init__(self, seeded: dict, seed: int = 1):
+        self.seeded = seeded
+        self.rng = random.Random(seed)
+        self.tokens: Dict[str, str] = {}
+        self.series_id: Optional[int] = None
+        self.created: deque = deque()
+        self._slots = itertools.count()
+        self._series = itertools.count()
+        # Writes go after the seeded dates so they never collide with them
+        self._free_from: date = seeded["last_date"] + timedelta(days=30)
+        self._series_from: date = seeded["last_date"] + timedelta(days=3650)
+
+    def headers(self, role: Optional[str]) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[role]}"} if role else {}
+
+    def room_id(self) -> int:
+        return self.rng.randint(1, self.seeded["rooms"])
+
+    def user_id(self) -> int:
+        return self.rng.randint(1, self.seeded["users"])
+
+    def seeded_date(self) -> date:
+        span = (self.seeded["last_date"] - self.seeded["first_date"]).days
+        return self.seeded["first_date"] + timedelta(days=self.rng.randint(0, span))
+
+    def reservation_id(self) -> int:
+        return self.rng.randint(1, self.seeded["reservations"])
+
+    def free_slot(self) -> dict:
+        """A one-hour slot no other request of the run will ask for"""
+        n = next(self._slots)
+        day, rest = divmod(n, 23 * self.seeded["rooms"])
+        room, hour = divmod(rest, 23)
+        return {
+            "fecha": (self._free_from + timedelta(days=day)).isoformat(),
+            "hora_inicio": f"{hour:02d}:00",
+            "hora_fin": f"{hour + 1:02d}:00",
+            "usuario_id": self.user_id(),
+            "sala_id": room + 1,
+        }
+
+    def free_series(self) -> dict:
+        """A four-week weekly series over dates no other series of the run uses"""
+        start = self._series_from + timedelta(weeks=5 * next(self._series))
+        return {
+            "fecha_inicio": start.isoformat(),
+            "fecha_fin": (start + timedelta(days=27)).isoformat(),
+            "hora_inicio": "09:00",
+            "hora_fin": "10:00",
+            "usuario_id": self.user_id(),
+            "sala_id": self.room_id(),
+            "dias_semana": "lunes,miercoles",
+        }
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: Callable[[LoadContext], str]
+    role: Optional[str] = "user"
+    body: Optional[Callable[[LoadContext], Any]] = None
+    ok: Tuple[int, ...] = (200,)
+    # Fraction of the requested count to send (bcrypt logins and exports are slow)
+    weight: float = 1.0
+    on_response: Optional[Callable[[LoadContext, httpx.Response], None]] = None
+    # Most statements one request may run, whatever the page size (None: not checked)
+    max_queries: Optional[int] = None
+
+def _remember_created(ctx: LoadContext, response: httpx.Response) -> None:
+    ctx.created.append(response.json()["id"])
+
+def _created_or_seeded(ctx: LoadContext) -> int:
+    return ctx.created.popleft() if ctx.created else ctx.reservation_id()
+
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("health", "GET", lambda c: "/", role=None),
+    # auth
+    Endpoint("auth.login", "POST", lambda c: "/auth/login", role=None, weight=0.1,
+             body=lambda c: {"email": USER_EMAIL, "contrasena": BENCH_PASSWORD}),
+    Endpoint("auth.verify_token", "POST", lambda c: "/auth/verify-token"),
+    Endpoint("auth.me", "GET", lambda c: "/auth/me"),
+    # users
+    Endpoint("users.list", "GET", lambda c: "/users/?limit=100", role="admin", max_queries=2),
+    Endpoint("users.me", "GET", lambda c: "/users/me"),
+    Endpoint("users.get", "GET", lambda c: f"/users/{c.user_id()}", max_queries=2),
+    # rooms
+    Endpoint("rooms.list", "GET", lambda c: "/rooms/?limit=100", max_queries=2),
+    Endpoint("rooms.available", "GET", lambda c: f"/rooms/available?fecha={c.seeded_date()}&hora_inicio=10:00",
+             max_queries=2),
+    Endpoint("rooms.get", "GET", lambda c: f"/rooms/{c.room_id()}"),
+    Endpoint("rooms.update", "PATCH", lambda c: f"/rooms/{c.room_id()}", role="admin",
+             body=lambda c: {"capacidad": c.rng.choice([4, 6, 8, 10, 20])}),
+    # reservations
+    Endpoint("reservations.create", "POST", lambda c: "/reservations/", ok=(201,),
+             body=lambda c: c.free_slot(), on_response=_remember_created),
+    Endpoint("reservations.bulk", "POST", lambda c: "/reservations/bulk", weight=0.5, max_queries=10,
+             body=lambda c: [c.free_slot() for _ in range(10)]),
+    Endpoint("reservations.list", "GET", lambda c: "/reservations/?limit=100", max_queries=3),
+    Endpoint("reservations.list_1000", "GET", lambda c: "/reservations/?limit=1000", weight=0.25, max_queries=3),
+    Endpoint("reservations.me", "GET", lambda c: "/reservations/me?limit=100", max_queries=3),
+    Endpoint("reservations.by_room", "GET", lambda c: f"/reservations/room/{c.room_id()}?limit=100", max_queries=3),
+    Endpoint("reservations.by_date", "GET", lambda c: f"/reservations/date/{c.seeded_date()}?limit=100", max_queries=3),
+    Endpoint("reservations.get", "GET", lambda c: f"/reservations/{c.reservation_id()}", max_queries=2),
+    Endpoint("reservations.update", "PATCH", lambda c: f"/reservations/{c.reservation_id()}",
+             body=lambda c: {"estado": "confirmada"}),
+    Endpoint("reservations.cancel", "DELETE", lambda c: f"/reservations/{_created_or_seeded(c)}", ok=(200, 400)),
+    Endpoint("reservations.export", "GET", lambda c: "/reservations/export?format=ndjson", role="admin", weight=0.05),
+    # series
+    Endpoint("series.create", "POST", lambda c: "/series/", ok=(201,), weight=0.2, body=lambda c: c.free_series()),
+    Endpoint("series.list", "GET", lambda c: "/series/?limit=100", max_queries=2),
+    Endpoint("series.reservations", "GET", lambda c: f"/series/{c.series_id}/reservations", max_queries=3),
+    # analytics and admin
+    Endpoint("analytics.utilization", "GET", role="admin", max_queries=3,
+             path=lambda c: f"/analytics/utilization?desde={c.seeded['first_date']}&hasta={c.seeded['last_date']}"),
+    Endpoint("admin.pool", "GET", lambda c: "/admin/pool", role="admin"),
+    Endpoint("metrics", "GET", lambda c: "/metrics", role=None, max_queries=0),
+]
+
+async def prepare(client: httpx.AsyncClient, ctx: LoadContext) -> None:
+    """Log in as the seeded admin and user, and create a series to read back"""
+    for role, email in (("admin", ADMIN_EMAIL), ("user", USER_EMAIL)):
+        response = await client.post("/auth/login", json={"email": email, "contrasena": BENCH_PASSWORD})
+        response.raise_for_status()
+        ctx.tokens[role] = response.json()["access_token"]
+
+    response = await client.post("/series/", json=ctx.free_series(), headers=ctx.headers("user"))
+    response.raise_for_status()
+    ctx.series_id = response.json()["serie"]["id"]
+
+async def _send(client: httpx.AsyncClient, ctx: LoadContext, endpoint: Endpoint) -> httpx.Response:
+    kwargs = {"headers": ctx.headers(endpoint.role)}
+    if endpoint.body is not None:
+        kwargs["json"] = endpoint.body(ctx)
+    return await client.request(endpoint.method, endpoint.path(ctx), **kwargs)
+
+async def run_endpoint(
+    client: httpx.AsyncClient, ctx: LoadContext, endpoint: Endpoint, requests: int, concurrency: int
+) -> dict:
+    for _ in range(WARMUP_REQUESTS):
+        await _send(client, ctx, endpoint)
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors = over_budget = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors, over_budget
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await _send(client, ctx, endpoint)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in endpoint.ok:
+                if not errors:
+                    logger.warning(f"\t{endpoint.name}: {response.status_code} {response.text[:200]}")
+                errors += 1
+                continue
+            if QUERIES_HEADER in response.headers:
+                queries.append(int(response.headers[QUERIES_HEADER]))
+            if endpoint.max_queries is not None:
+                try:
+                    assert_query_budget(response, endpoint.max_queries, endpoint.name)
+                except QueryBudgetExceeded as e:
+                    if not over_budget:
+                        logger.warning(f"\t{e}")
+                    over_budget += 1
+            if endpoint.on_response is not None:
+                endpoint.on_response(ctx, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    stats = summarize(latencies, time.perf_counter() - started, errors)
+    if queries:
+        stats["queries_max"] = max(queries)
+    stats["over_budget"] = over_budget
+    return stats
+
+async def run_load(
+    base_url: str,
+    seeded: dict,
+    requests: int = 200,
+    concurrency: int = 10,
+    only: Optional[Sequence[str]] = None,
+    seed: int = 1,
+) -> Dict[str, dict]:
+    """Drive each endpoint in turn and return its latency and throughput summary by name"""
+    ctx = LoadContext(seeded, seed)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: Dict[str, dict] = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await prepare(client, ctx)
+        for endpoint in ENDPOINTS:
+            if only and not any(endpoint.name.startswith(prefix) for prefix in only):
+                continue
+            count = max(int(requests * endpoint.weight), 1)
+            results[endpoint.name] = await run_endpoint(client, ctx, endpoint, count, concurrency)
+            stats = results[endpoint.name]
+            logger.info(
+                f"\t{endpoint.name:<28} n={stats['count']:<5} p50={stats['p50_ms']:>8.2f}ms "
+                f"p95={stats['p95_ms']:>8.2f}ms p99={stats['p99_ms']:>8.2f}ms {stats['throughput_rps']:>8.1f} req/s"
+                + (f" queries<={stats['queries_max']}" if "queries_max" in stats else "")
+                + (f" errors={stats['errors']}" if stats["errors"] else "")
+                + (f" over_budget={stats['over_budget']}" if stats["over_budget"] else "")
+            )
+    return results
@@ -0,0 +1,87 @@
+"""
+Micro-benchmarks: controller methods called directly on a sync session and
+the serialization steps of the large listings, with no HTTP in between.
+"""
+import logging
+import time
+from datetime import time as dt_time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+from pydantic import TypeAdapter
+from sqlmodel import Session
+
+from benchmarks.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+def measure(run: Callable[[], object], iterations: int, warmup: int = 3) -> dict:
+    for _ in range(warmup):
+        run()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+def _cases(session: Session, seeded: dict) -> List[Tuple[str, Callable[[], object]]]:
+    from backend.controllers.analytics.AnalyticsController import AnalyticsController, _report_cache
+    from backend.controllers.reservations.ReservationsController import ReservationsController
+    from backend.controllers.rooms.RoomsController import RoomsController
+    from backend.controllers.users.UsersController import UsersController
+    from backend.core.catalog import room_catalog
+    from backend.core.occupancy import OccupancyIndex
+    from backend.core.responses import FastJSONResponse
+    from backend.models.reservations.ReservationsModel import ReservationReadWithDetails
+
+    reservations = ReservationsController(session)
+    rooms = RoomsController(session)
+    fecha = seeded["first_date"]
+    details = reservations.list_reservations_with_details(limit=1000)
+    details_adapter = TypeAdapter(List[ReservationReadWithDetails])
+    cursor = ReservationsController.keyset.next_cursor(details, len(details))
+
+    def utilization():
+        _report_cache.clear()
+        return AnalyticsController(session).get_utilization(seeded["first_date"], seeded["last_date"])
+
+    def rooms_uncached():
+        room_catalog.invalidate()
+        return rooms.list_rooms(limit=100)
+
+    def occupancy_claim_release():
+        index = OccupancyIndex()
+        index.ensure_loaded(session, fecha)
+        for hour in range(24):
+            index.claim(session, ("bench", hour), 1, fecha, dt_time(hour), dt_time(hour, 59))
+        for hour in range(24):
+            index.release(("bench", hour))
+
+    return [
+        ("controller.reservations_with_details_100", lambda: reservations.list_reservations_with_details(limit=100)),
+        ("controller.reservations_with_details_1000", lambda: reservations.list_reservations_with_details(limit=1000)),
+        ("controller.reservations_next_page", lambda: reservations.list_reservations_with_details(limit=100, cursor=cursor)),
+        ("controller.reservations_by_date", lambda: reservations.get_reservations_by_date(fecha, limit=100)),
+        ("controller.rooms_list_cached", lambda: rooms.list_rooms(limit=100)),
+        ("controller.rooms_list_uncached", rooms_uncached),
+        ("controller.rooms_available", lambda: rooms.list_available_rooms(fecha, dt_time(10))),
+        ("controller.users_list", lambda: UsersController(session).list_users(limit=100)),
+        ("controller.analytics_utilization", utilization),
+        ("controller.occupancy_day_load_claim_release", occupancy_claim_release),
+        ("serialize.details_1000_pydantic", lambda: details_adapter.dump_json(details_adapter.validate_python(details))),
+        ("serialize.details_1000_orjson", lambda: orjson.dumps(details)),
+        ("serialize.details_1000_fast_response", lambda: FastJSONResponse(details).body),
+    ]
+
+def run_micro(engine, seeded: dict, iterations: int = 50, only: Optional[Sequence[str]] = None) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    with Session(engine) as session:
+        for name, run in _cases(session, seeded):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = stats = measure(run, iterations)
+            logger.info(f"\t{name:<48} p50={stats['p50_ms']:>8.3f}ms p95={stats['p95_ms']:>8.3f}ms")
+        session.rollback()
+    return results
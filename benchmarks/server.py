@@ -0,0 +1,38 @@
+import socket
+import threading
+import time
+
+import uvicorn
+
+class ServerThread:
+    """
+    Runs an ASGI app with uvicorn on a free local port in a background thread.
+    The lifespan is off: the benchmark prepares the database itself.
+    """
+
+    def __init__(self, app, host: str = "127.0.0.1"):
+        with socket.socket() as probe:
+            probe.bind((host, 0))
+            self.port = probe.getsockname()[1]
+        self.host = host
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host=host, port=self.port, lifespan="off", log_level="warning", access_log=False,
+        ))
+        self.thread = threading.Thread(target=self.server.run, name="bench-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10) -> "ServerThread":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("El servidor de benchmarks no arrancó")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
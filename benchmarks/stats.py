@@ -0,0 +1,46 @@
+from typing import Dict, List, Sequence, Tuple
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """p-th percentile (0-100) of already sorted values, linearly interpolated"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(latencies: List[float], wall_seconds: float, errors: int = 0) -> dict:
+    """Latency percentiles (ms) and throughput of a list of per-operation durations in seconds"""
+    values = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+        "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+def compare(baseline: dict, current: dict, metric: str = "p95_ms", threshold: float = 0.10) -> Tuple[List[list], List[str]]:
+    """
+    Rows of (section, name, baseline, current, change) for every benchmark present
+    in both result files, and the names whose `metric` got worse by more than
+    `threshold` (0.10 = 10%).
+    """
+    rows, regressions = [], []
+    for section in ("load", "micro"):
+        old: Dict[str, dict] = baseline.get(section, {})
+        new: Dict[str, dict] = current.get(section, {})
+        for name in sorted(old.keys() & new.keys()):
+            before, after = old[name].get(metric), new[name].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            rows.append([section, name, before, after, change])
+            # Latencies regress upwards, throughput downwards
+            if (-change if metric == "throughput_rps" else change) > threshold:
+                regressions.append(f"{section}/{name}")
+    return rows, regressions
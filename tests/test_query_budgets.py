@@ -0,0 +1,94 @@
+"""
+Query budgets of the reservation listings: a page costs the same number of
+statements whatever its size, so a listing never turns into N+1 queries.
+
+Runs against in-memory SQLite; no MySQL needed:
+
+    python -m pytest tests
+"""
+import os
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "true"
+os.environ["ENABLE_CONSOLE_INTERFACE"] = "false"
+
+import datetime as dt
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.auth.controller import get_current_user
+from app.auth.model import TokenData
+from app.main import app
+from backend.controllers.reservations.ReservationsController import ReservationsController
+from backend.core.db import get_engine
+from backend.core.querystats import assert_query_budget, query_budget
+from backend.models.reservations.ReservationsModel import Reservation
+from backend.models.rooms.RoomsModel import Room
+from backend.models.users.UsersModel import User
+
+USERS, ROOMS, RESERVATIONS = 3, 5, 250
+FIRST_DATE = dt.date(2030, 1, 1)
+
+# Most statements a detail listing may run, at any limit
+LISTING_BUDGET = 3
+
+def _seed() -> None:
+    with Session(get_engine()) as session:
+        session.add_all(
+            User(nombre=f"Usuario {i}", email=f"usuario{i}@geresaco.test", contrasena_hash="x")
+            for i in range(USERS)
+        )
+        session.add_all(
+            Room(nombre=f"Sala {i}", sede="bogota", capacidad=6, recursos="pizarra")
+            for i in range(ROOMS)
+        )
+        session.commit()
+        session.add_all(
+            Reservation(
+                fecha=FIRST_DATE + dt.timedelta(days=i // 10),
+                hora_inicio=dt.time(8 + i % 10),
+                hora_fin=dt.time(9 + i % 10),
+                usuario_id=1 + i % USERS,
+                sala_id=1 + i % ROOMS,
+            )
+            for i in range(RESERVATIONS)
+        )
+        session.commit()
+
+@pytest.fixture(scope="module")
+def client():
+    app.dependency_overrides[get_current_user] = lambda: TokenData(
+        email="usuario0@geresaco.test", user_id=1, role="admin"
+    )
+    with TestClient(app) as client:
+        _seed()
+        yield client
+    app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("limit", [1, 10, 100, 1000])
+@pytest.mark.parametrize("path", [
+    "/reservations/",
+    "/reservations/me",
+    "/reservations/room/1",
+    f"/reservations/date/{FIRST_DATE.isoformat()}",
+])
+def test_listing_budget_does_not_grow_with_limit(client, path, limit):
+    response = client.get(path, params={"limit": limit})
+    assert response.status_code == 200
+    assert response.json()
+    assert_query_budget(response, LISTING_BUDGET)
+
+def test_listing_next_page_within_budget(client):
+    first = client.get("/reservations/", params={"limit": 100})
+    cursor = first.headers["X-Next-Cursor"]
+    response = client.get("/reservations/", params={"limit": 100, "cursor": cursor})
+    assert response.status_code == 200
+    assert_query_budget(response, LISTING_BUDGET)
+
+@pytest.mark.parametrize("limit", [1, 100, 1000])
+def test_controller_listing_budget(client, limit):
+    with Session(get_engine()) as session, query_budget(LISTING_BUDGET, "list_reservations_with_details"):
+        reservations = ReservationsController(session).list_reservations_with_details(limit=limit)
+    assert len(reservations) == min(limit, RESERVATIONS)